@@ -1,10 +1,28 @@
+import os
+import shutil
+
 import uvicorn
 
 from backend.settings import settings
 
 
+def set_multiproc_dir() -> None:
+    """
+    Set up the prometheus multiprocess directory.
+
+    Metrics of every uvicorn worker are written to this directory,
+    so they are aggregated on any worker serving /metrics.
+    """
+    shutil.rmtree(settings.prometheus_dir, ignore_errors=True)
+    settings.prometheus_dir.mkdir(parents=True, exist_ok=True)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = str(
+        settings.prometheus_dir.expanduser().absolute(),
+    )
+
+
 def main() -> None:
     """Entrypoint of the application."""
+    set_multiproc_dir()
     uvicorn.run(
         "backend.web.application:get_app",
         workers=settings.workers_count,
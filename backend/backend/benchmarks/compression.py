@@ -0,0 +1,94 @@
+"""Compare the bytes saved and the CPU cost of each response encoding.
+
+Task list pages of each size are encoded as the list view sends them, with
+descriptions of random length up to the 2048 characters allowed, then
+compressed with every available encoding at a few levels.
+
+Run with ``python -m backend.benchmarks.compression``.
+"""
+
+import argparse
+import random
+import timeit
+import uuid
+from datetime import UTC, datetime, timedelta
+
+from backend.benchmarks.seed import WORDS
+from backend.db.models.tasks import Task
+from backend.db.models.users import User  # noqa: F401 - resolves Task.user
+from backend.settings import settings
+from backend.web.api.v1.tasks.schema import TaskOut
+from backend.web.middleware.compression import Compressor, load_compressors
+from backend.web.schemas import json_response
+
+PAGE_SIZES = (10, 50, 500, 5000)
+# The fastest levels, the configured ones and stronger ones
+LEVELS = (
+    {"gzip": 1, "br": 1, "zstd": 1},
+    {
+        "gzip": settings.compression_gzip_level,
+        "br": settings.compression_brotli_level,
+        "zstd": settings.compression_zstd_level,
+    },
+    {"gzip": 9, "br": 9, "zstd": 9},
+)
+MAX_DESCRIPTION = 2048
+
+
+def make_page(size: int, rng: random.Random) -> bytes:
+    """Encode a page of tasks like the tasks list view."""
+    user_id = uuid.uuid4()
+    created_at = datetime.now(UTC)
+    tasks = []
+    for index in range(1, size + 1):
+        description = " ".join(rng.choices(WORDS, k=rng.randrange(1, 300)))
+        tasks.append(
+            Task(
+                id=index,
+                title=" ".join(rng.choices(WORDS, k=3)),
+                description=description[:MAX_DESCRIPTION],
+                is_done=index % 2 == 0,
+                created_at=created_at - timedelta(minutes=index),
+                user_id=user_id,
+            ),
+        )
+    page = TaskOut.dump_paginated(tasks, size, 1, size)
+    return bytes(json_response(page).body)
+
+
+def measure(compress: Compressor, body: bytes, repeat: int) -> float:
+    """Best time of one compression in milliseconds."""
+    timer = timeit.Timer(lambda: compress(body))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number * 1000
+
+
+def main() -> None:
+    """Print the size and time of each encoding for each page size."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)  # noqa: S311
+
+    print(  # noqa: T201
+        f"{'size':>6} {'bytes':>10} {'encoding':>8} {'level':>5} "
+        f"{'compressed':>10} {'saved':>6} {'ms':>9} {'MB/s':>8}",
+    )
+    for size in PAGE_SIZES:
+        body = make_page(size, rng)
+        for levels in LEVELS:
+            compressors = load_compressors(levels["gzip"], levels["br"], levels["zstd"])
+            for encoding, compress in compressors.items():
+                level = levels[encoding]
+                compressed = len(compress(body))
+                ms = measure(compress, body, args.repeat)
+                print(  # noqa: T201
+                    f"{size:>6} {len(body):>10} {encoding:>8} {level:>5} "
+                    f"{compressed:>10} {1 - compressed / len(body):>6.1%} "
+                    f"{ms:>9.3f} {len(body) / ms / 1000:>8.1f}",
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,484 @@
+"""Load test the API with the benchmark users.
+
+Virtual users log in as the users of ``backend.benchmarks.seed`` and run
+a weighted mix of login, task list, detail, create and update requests for
+a fixed duration. ``inprocess`` mode calls the ASGI app directly, so the
+numbers leave out the HTTP server. ``http`` mode starts the server with
+``--workers`` uvicorn workers, or targets ``--url``. The login throttle
+is disabled in the started app, as all virtual users share one IP.
+
+The latency percentiles and throughput of each scenario are printed and
+compared with the saved baseline of the mode, the run fails if a p95
+latency or a throughput is worse than the baseline by more than
+``--tolerance``. Baselines depend on the machine and the seeded data,
+save them with ``--save-baseline`` on the machine running the comparison.
+
+Run with ``python -m backend.benchmarks.load``.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+import httpx
+import ujson
+
+from backend.benchmarks.seed import EMAIL_PATTERN, PASSWORD, WORDS
+from backend.services.auth.throttle import auth_throttle
+from backend.web.application import get_app
+
+MODES = ("inprocess", "http")
+PAGE_SIZE = 50
+# Page of the deep offset pagination scenario
+DEEP_PAGE = 20
+# Pages followed by the cursor pagination scenario before starting over
+CURSOR_PAGES = 20
+# Seconds to wait for the HTTP server to start
+STARTUP_TIMEOUT = 60
+PERCENTILES = (50, 95, 99)
+
+
+class VirtualUser:
+    """A client logged in as one of the benchmark users.
+
+    Attributes:
+        client (httpx.AsyncClient): The client, with the user's cookies.
+        email (str): The user's email.
+        rng (random.Random): The random source of the user's requests.
+        task_ids (list[int]): Tasks of the user seen in responses.
+        list_etag (Optional[str]): ETag of the last default task list.
+        cursor (Optional[str]): Cursor of the next page to follow.
+        cursor_pages (int): Pages followed with the cursor.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, email: str, seed: int) -> None:
+        self.client = client
+        self.email = email
+        self.rng = random.Random(seed)  # noqa: S311
+        self.task_ids: list[int] = []
+        self.list_etag: Optional[str] = None
+        self.cursor: Optional[str] = None
+        self.cursor_pages = 0
+
+    async def login(self) -> httpx.Response:
+        """Log in and keep the auth cookies."""
+        response = await self.client.post(
+            "/v1/auth/login",
+            json={"email": self.email, "password": PASSWORD},
+        )
+        # The cookies are secure unless reloading, resend them over plain HTTP
+        for name, value in response.cookies.items():
+            self.client.cookies.set(name, value)
+        return response
+
+    async def list_tasks(self, **params: Any) -> httpx.Response:
+        """Get a page of tasks, remembering their ids."""
+        response = await self.client.get(
+            "/v1/tasks/",
+            params={"size": PAGE_SIZE, **params},
+        )
+        if response.status_code == httpx.codes.OK:
+            page = response.json()
+            self.task_ids = [task["id"] for task in page["items"]] or self.task_ids
+            self.cursor = page.get("nextCursor")
+        return response
+
+    def random_task_id(self) -> int:
+        """Get one of the seen task ids, 0 if none."""
+        return self.rng.choice(self.task_ids) if self.task_ids else 0
+
+
+Scenario = Callable[[VirtualUser], Awaitable[httpx.Response]]
+
+
+async def login(user: VirtualUser) -> httpx.Response:
+    """Log in, dominated by the password hash."""
+    return await user.login()
+
+
+async def list_default(user: VirtualUser) -> httpx.Response:
+    """First page in the default order."""
+    response = await user.list_tasks()
+    user.list_etag = response.headers.get("ETag")
+    return response
+
+
+async def list_not_modified(user: VirtualUser) -> httpx.Response:
+    """Revalidate the first page, ``304`` unless the tasks changed."""
+    headers = {"If-None-Match": user.list_etag} if user.list_etag else {}
+    response = await user.client.get(
+        "/v1/tasks/",
+        params={"size": PAGE_SIZE},
+        headers=headers,
+    )
+    user.list_etag = response.headers.get("ETag", user.list_etag)
+    return response
+
+
+async def list_done_desc(user: VirtualUser) -> httpx.Response:
+    """Done tasks, newest first."""
+    return await user.list_tasks(is_done="true", sort_order="desc")
+
+
+async def list_title(user: VirtualUser) -> httpx.Response:
+    """Tasks with a word in the title, by title."""
+    return await user.list_tasks(title=user.rng.choice(WORDS), sort_by="title")
+
+
+async def list_search(user: VirtualUser) -> httpx.Response:
+    """Full text search by relevance, without the exact total."""
+    return await user.list_tasks(
+        q=" ".join(user.rng.sample(WORDS, 2)),
+        sort_by="rank",
+        include_total="false",
+    )
+
+
+async def list_deep_page(user: VirtualUser) -> httpx.Response:
+    """A deep page with offset pagination."""
+    return await user.list_tasks(page=DEEP_PAGE)
+
+
+async def list_cursor(user: VirtualUser) -> httpx.Response:
+    """The next page with cursor pagination."""
+    if user.cursor is None or user.cursor_pages >= CURSOR_PAGES:
+        user.cursor, user.cursor_pages = None, 0
+    params = {"cursor": user.cursor} if user.cursor else {}
+    user.cursor_pages += 1
+    return await user.list_tasks(**params)
+
+
+async def detail(user: VirtualUser) -> httpx.Response:
+    """A task by id."""
+    return await user.client.get(f"/v1/tasks/{user.random_task_id()}")
+
+
+async def create(user: VirtualUser) -> httpx.Response:
+    """A new task."""
+    response = await user.client.post(
+        "/v1/tasks/",
+        json={
+            "title": " ".join(user.rng.choices(WORDS, k=3)),
+            "description": " ".join(user.rng.choices(WORDS, k=12)),
+            "isDone": False,
+        },
+    )
+    if response.status_code == httpx.codes.OK:
+        user.task_ids.append(response.json()["id"])
+    return response
+
+
+async def update(user: VirtualUser) -> httpx.Response:
+    """Toggle a task."""
+    return await user.client.put(
+        f"/v1/tasks/{user.random_task_id()}",
+        json={"isDone": bool(user.rng.getrandbits(1))},
+    )
+
+
+# Scenarios with their weights in the mix
+SCENARIOS: dict[str, tuple[Scenario, int]] = {
+    "login": (login, 1),
+    "list_default": (list_default, 10),
+    "list_not_modified": (list_not_modified, 5),
+    "list_done_desc": (list_done_desc, 4),
+    "list_title": (list_title, 4),
+    "list_search": (list_search, 4),
+    "list_deep_page": (list_deep_page, 2),
+    "list_cursor": (list_cursor, 4),
+    "detail": (detail, 10),
+    "create": (create, 3),
+    "update": (update, 3),
+}
+
+
+class Samples:
+    """Latencies and errors of the scenarios."""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = {name: [] for name in SCENARIOS}
+        self.errors: dict[str, int] = dict.fromkeys(SCENARIOS, 0)
+
+    def add(self, name: str, latency: float, ok: bool) -> None:
+        """Record a request of a scenario."""
+        self.latencies[name].append(latency)
+        if not ok:
+            self.errors[name] += 1
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Nearest rank percentile of sorted values."""
+    if not values:
+        return math.nan
+    return values[max(math.ceil(percent / 100 * len(values)) - 1, 0)]
+
+
+def summarize(samples: Samples, elapsed: float) -> dict[str, dict[str, float]]:
+    """
+    Get the statistics of each scenario.
+
+    Args:
+        samples (Samples): The recorded requests.
+        elapsed (float): Seconds the requests were recorded for.
+
+    Returns:
+        dict[str, dict[str, float]]: The request count, errors, requests per
+          second and latency percentiles in milliseconds of each scenario.
+    """
+    summary = {}
+    for name, latencies in samples.latencies.items():
+        if not latencies:
+            continue
+        ordered = sorted(latencies)
+        stats = {
+            "count": len(ordered),
+            "errors": samples.errors[name],
+            "rps": len(ordered) / elapsed,
+        }
+        for percent in PERCENTILES:
+            stats[f"p{percent}"] = percentile(ordered, percent) * 1000
+        summary[name] = stats
+    return summary
+
+
+def print_summary(summary: dict[str, dict[str, float]]) -> None:
+    """Print the statistics as a table."""
+    print(  # noqa: T201
+        f"{'scenario':<18} {'count':>7} {'errors':>6} {'req/s':>8} "
+        f"{'p50, ms':>8} {'p95, ms':>8} {'p99, ms':>8}",
+    )
+    for name, stats in summary.items():
+        print(  # noqa: T201
+            f"{name:<18} {stats['count']:>7.0f} {stats['errors']:>6.0f} "
+            f"{stats['rps']:>8.1f} {stats['p50']:>8.2f} {stats['p95']:>8.2f} "
+            f"{stats['p99']:>8.2f}",
+        )
+
+
+def regressions(
+    summary: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> list[str]:
+    """
+    Compare the statistics with a baseline.
+
+    Args:
+        summary (dict[str, dict[str, float]]): The statistics of the run.
+        baseline (dict[str, dict[str, float]]): The baseline statistics.
+        tolerance (float): The accepted relative slowdown.
+
+    Returns:
+        list[str]: Descriptions of the regressions.
+    """
+    found = []
+    for name, stats in summary.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if stats["p95"] > base["p95"] * (1 + tolerance):
+            found.append(
+                f"{name}: p95 {stats['p95']:.2f} ms, baseline {base['p95']:.2f} ms",
+            )
+        if stats["rps"] < base["rps"] * (1 - tolerance):
+            found.append(
+                f"{name}: {stats['rps']:.1f} req/s, baseline {base['rps']:.1f} req/s",
+            )
+    return found
+
+
+async def _drive(
+    user: VirtualUser,
+    deadline: float,
+    samples: Optional[Samples],
+) -> None:
+    """Run random scenarios until the deadline, recording them if sampling."""
+    names = list(SCENARIOS)
+    weights = [weight for _, weight in SCENARIOS.values()]
+    while time.perf_counter() < deadline:
+        name = user.rng.choices(names, weights)[0]
+        scenario, _ = SCENARIOS[name]
+        start = time.perf_counter()
+        try:
+            response = await scenario(user)
+        except httpx.HTTPError:
+            ok = False
+        else:
+            ok = response.status_code < httpx.codes.BAD_REQUEST
+        if samples is not None:
+            samples.add(name, time.perf_counter() - start, ok)
+
+
+async def run(
+    transport: httpx.AsyncBaseTransport,
+    base_url: str,
+    users: int,
+    concurrency: int,
+    warmup: float,
+    duration: float,
+) -> dict[str, dict[str, float]]:
+    """
+    Run the scenario mix.
+
+    Args:
+        transport (httpx.AsyncBaseTransport): The transport to the app.
+        base_url (str): The URL of the app.
+        users (int): The number of seeded users to log in as.
+        concurrency (int): The number of virtual users.
+        warmup (float): Seconds to run before recording.
+        duration (float): Seconds to record.
+
+    Returns:
+        dict[str, dict[str, float]]: The statistics, see ``summarize``.
+    """
+    async with contextlib.AsyncExitStack() as stack:
+        virtual_users = []
+        for index in range(concurrency):
+            client = await stack.enter_async_context(
+                httpx.AsyncClient(transport=transport, base_url=base_url),
+            )
+            user = VirtualUser(client, EMAIL_PATTERN.format(index % users), index)
+            response = await user.login()
+            if response.status_code != httpx.codes.NO_CONTENT:
+                raise SystemExit(
+                    f"Can't log in as {user.email}, seed the benchmark users first",
+                )
+            await user.list_tasks()
+            virtual_users.append(user)
+
+        deadline = time.perf_counter() + warmup
+        await asyncio.gather(*(_drive(user, deadline, None) for user in virtual_users))
+        samples = Samples()
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(_drive(user, start + duration, samples) for user in virtual_users),
+        )
+        return summarize(samples, time.perf_counter() - start)
+
+
+@contextlib.asynccontextmanager
+async def inprocess_app() -> AsyncIterator[tuple[httpx.AsyncBaseTransport, str]]:
+    """Run the app in this process, yielding its transport and URL."""
+    auth_throttle.enabled = False
+    app = get_app()
+    async with app.router.lifespan_context(app):
+        yield httpx.ASGITransport(app=app), "http://bench"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+@contextlib.asynccontextmanager
+async def http_app(
+    url: Optional[str],
+    workers: int,
+    env: Optional[dict[str, str]] = None,
+) -> AsyncIterator[tuple[httpx.AsyncBaseTransport, str]]:
+    """Start the HTTP server unless given its URL, yielding a transport and URL.
+
+    The server is started with the extra environment variables of ``env``
+    and yielded once it is ready.
+    """
+    transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=None))
+    if url is not None:
+        yield transport, url
+        return
+
+    port = _free_port()
+    server_env = {
+        **os.environ,
+        "HOST": "127.0.0.1",
+        "PORT": str(port),
+        "WORKERS_COUNT": str(workers),
+        "RELOAD": "false",
+        "AUTH_THROTTLE_ENABLED": "false",
+        **(env or {}),
+    }
+    url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(  # noqa: S603
+        [sys.executable, "-m", "backend"],
+        env=server_env,
+    )
+    try:
+        async with httpx.AsyncClient(base_url=url) as client:
+            deadline = time.perf_counter() + STARTUP_TIMEOUT
+            while True:
+                with contextlib.suppress(httpx.TransportError):
+                    if (await client.get("/ready")).is_success:
+                        break
+                if server.poll() is not None or time.perf_counter() > deadline:
+                    raise SystemExit("The server didn't start")
+                await asyncio.sleep(0.2)
+        yield transport, url
+    finally:
+        server.terminate()
+        server.wait(STARTUP_TIMEOUT)
+
+
+async def benchmark(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    """Run the benchmark in the chosen mode."""
+    app = (
+        inprocess_app()
+        if args.mode == "inprocess"
+        else http_app(args.url, args.workers)
+    )
+    async with app as (transport, base_url):
+        return await run(
+            transport,
+            base_url,
+            args.users,
+            args.concurrency,
+            args.warmup,
+            args.duration,
+        )
+
+
+def main() -> None:
+    """Run the benchmark and compare it with the baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=MODES, default="inprocess")
+    parser.add_argument("--url", help="target a running server in http mode")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--users", type=int, default=100, help="seeded users")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    baseline_path = args.baseline or Path(".benchmarks", f"load-{args.mode}.json")
+
+    summary = asyncio.run(benchmark(args))
+    print_summary(summary)
+
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(ujson.dumps(summary, indent=2))
+        print(f"Saved the baseline to {baseline_path}")  # noqa: T201
+    elif baseline_path.exists():
+        found = regressions(
+            summary,
+            ujson.loads(baseline_path.read_text()),
+            args.tolerance,
+        )
+        for regression in found:
+            print(f"REGRESSION {regression}")  # noqa: T201
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
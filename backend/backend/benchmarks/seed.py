@@ -0,0 +1,182 @@
+"""Seed the database with benchmark users and tasks.
+
+The users are ``bench-<n>@example.com`` with one password, earlier benchmark
+users and their tasks are replaced. Each user gets ``--tasks`` tasks with the
+``uniform`` distribution, with ``skewed`` the task counts follow Zipf's law,
+so a few users own most of the tasks and the mean stays ``--tasks``.
+
+Run with ``python -m backend.benchmarks.seed``.
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import Any, Iterator
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from backend.db.models import load_all_models
+from backend.log import configure_logging
+from backend.services.auth.password import PasswordHelper
+from backend.settings import settings
+
+logger = logging.getLogger(__name__)
+
+EMAIL_PATTERN = "bench-{}@example.com"
+PASSWORD = "bench-password"  # noqa: S105
+DISTRIBUTIONS = ("uniform", "skewed")
+# Tasks loaded by one COPY
+COPY_BATCH_SIZE = 10_000
+# Share of done tasks
+DONE_SHARE = 0.3
+TASK_COLUMNS = ["title", "description", "is_done", "created_at", "user_id"]
+# Title and description words, the list benchmarks filter and search by them
+WORDS = (
+    "report",
+    "meeting",
+    "invoice",
+    "release",
+    "review",
+    "quarterly",
+    "budget",
+    "design",
+    "deploy",
+    "customer",
+    "backlog",
+    "roadmap",
+)
+
+
+def task_counts(users: int, tasks: int, distribution: str) -> list[int]:
+    """
+    Get the number of tasks of each user.
+
+    Args:
+        users (int): The number of users.
+        tasks (int): The mean number of tasks per user.
+        distribution (str): ``uniform`` or ``skewed``.
+
+    Returns:
+        list[int]: The task counts, the largest first.
+    """
+    if distribution == "uniform":
+        return [tasks] * users
+    weights = [1 / rank for rank in range(1, users + 1)]
+    scale = users * tasks / sum(weights)
+    return [round(weight * scale) for weight in weights]
+
+
+def _task_records(
+    rng: random.Random,
+    user_id: uuid.UUID,
+    count: int,
+    now: datetime,
+) -> Iterator[tuple[Any, ...]]:
+    """Generate the ``tasks`` rows of a user."""
+    for _ in range(count):
+        title = " ".join(rng.choices(WORDS, k=3))
+        description = " ".join(rng.choices(WORDS, k=12))
+        created_at = now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+        yield title, description, rng.random() < DONE_SHARE, created_at, user_id
+
+
+async def _copy(
+    connection: AsyncConnection,
+    table: str,
+    columns: list[str],
+    records: list[tuple[Any, ...]],
+) -> None:
+    raw_connection = await connection.get_raw_connection()
+    # The asyncpg connection
+    driver_connection: Any = raw_connection.driver_connection
+    await driver_connection.copy_records_to_table(
+        table,
+        records=records,
+        columns=columns,
+    )
+
+
+async def seed(users: int, tasks: int, distribution: str, seed_value: int) -> None:
+    """
+    Replace the benchmark users and tasks.
+
+    Args:
+        users (int): The number of users.
+        tasks (int): The mean number of tasks per user.
+        distribution (str): ``uniform`` or ``skewed``.
+        seed_value (int): The random seed, the same seed gives the same tasks.
+    """
+    load_all_models()
+    rng = random.Random(seed_value)  # noqa: S311
+    hashed_password = PasswordHelper.hash(PASSWORD)
+    user_ids = [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(users)]
+    counts = task_counts(users, tasks, distribution)
+    # The task timestamps are naive UTC
+    now = datetime.now(UTC).replace(tzinfo=None)
+
+    engine = create_async_engine(str(settings.db_url), echo=settings.db_echo)
+    try:
+        async with engine.begin() as connection:
+            await connection.execute(
+                text("DELETE FROM users WHERE email LIKE :pattern"),
+                {"pattern": EMAIL_PATTERN.format("%")},
+            )
+            await _copy(
+                connection,
+                "users",
+                ["id", "email", "hashed_password"],
+                [
+                    (user_id, EMAIL_PATTERN.format(index), hashed_password)
+                    for index, user_id in enumerate(user_ids)
+                ],
+            )
+            batch: list[tuple[Any, ...]] = []
+            for user_id, count in zip(user_ids, counts, strict=True):
+                for record in _task_records(rng, user_id, count, now):
+                    batch.append(record)
+                    if len(batch) >= COPY_BATCH_SIZE:
+                        await _copy(
+                            connection,
+                            "tasks",
+                            TASK_COLUMNS,
+                            batch,
+                        )
+                        batch = []
+            if batch:
+                await _copy(
+                    connection,
+                    "tasks",
+                    TASK_COLUMNS,
+                    batch,
+                )
+        async with engine.begin() as connection:
+            await connection.execute(text("ANALYZE users, tasks"))
+    finally:
+        await engine.dispose()
+    logger.info(
+        "Seeded %d users with %d tasks, at most %d per user",
+        users,
+        sum(counts),
+        max(counts, default=0),
+    )
+
+
+def main() -> None:
+    """Entrypoint of the benchmark seeding."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=1000, help="tasks per user")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    configure_logging()
+    asyncio.run(seed(args.users, args.tasks, args.distribution, args.seed))
+
+
+if __name__ == "__main__":
+    main()
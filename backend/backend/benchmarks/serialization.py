@@ -0,0 +1,103 @@
+"""Compare the task list serialization paths.
+
+The model path validates every task into ``TaskOut``, then FastAPI
+validates and serializes the page again for the ``response_model`` and
+``UJSONResponse`` encodes it. The fast path dumps the task attributes and
+encodes them once.
+
+Run with ``python -m backend.benchmarks.serialization``.
+"""
+
+import argparse
+import timeit
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import Any, Callable
+
+import ujson
+from fastapi.responses import UJSONResponse
+from fastapi.utils import create_model_field
+
+from backend.db.models.tasks import Task
+from backend.db.models.users import User  # noqa: F401 - resolves Task.user
+from backend.web.api.v1.tasks.schema import TaskOut
+from backend.web.schemas import Paginated, json_response
+
+PAGE_SIZES = (50, 500, 5000)
+
+response_field = create_model_field(
+    name="Response_read_tasks",
+    type_=Paginated[TaskOut],
+    mode="serialization",
+)
+
+
+def make_tasks(count: int) -> list[Task]:
+    """Build transient tasks like the ones loaded for a page."""
+    user_id = uuid.uuid4()
+    created_at = datetime.now(UTC)
+    return [
+        Task(
+            id=index,
+            title=f"Task {index}",
+            description=f"Description of task {index} " * 4,
+            is_done=index % 2 == 0,
+            created_at=created_at - timedelta(minutes=index),
+            user_id=user_id,
+        )
+        for index in range(1, count + 1)
+    ]
+
+
+def model_path(tasks: list[Task]) -> bytes:
+    """Serialize a page the way the response model does."""
+    page = Paginated(
+        items=[TaskOut.model_validate(task) for task in tasks],
+        total=len(tasks),
+        total_exact=True,
+        page=1,
+        size=len(tasks),
+    )
+    # The steps of ``serialize_response``, without an event loop per call
+    value, errors = response_field.validate(page, {}, loc=("response",))
+    if errors:
+        raise SystemExit(f"Invalid response: {errors}")
+    content = response_field.serialize(value, by_alias=True)
+    return bytes(UJSONResponse(content).body)
+
+
+def fast_path(tasks: list[Task]) -> bytes:
+    """Serialize a page without validation."""
+    page = TaskOut.dump_paginated(tasks, len(tasks), 1, len(tasks))
+    return bytes(json_response(page).body)
+
+
+def measure(fn: Callable[[list[Task]], bytes], tasks: list[Task], repeat: int) -> float:
+    """Best time of one call in milliseconds."""
+    timer = timeit.Timer(lambda: fn(tasks))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number * 1000
+
+
+def main() -> None:
+    """Print the timings of both paths for each page size."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'model, ms':>12} {'fast, ms':>12} {'speedup':>8}")  # noqa: T201
+    for size in PAGE_SIZES:
+        tasks = make_tasks(size)
+        expected: Any = ujson.loads(model_path(tasks))
+        if ujson.loads(fast_path(tasks)) != expected:
+            raise SystemExit(f"The paths disagree at page size {size}")
+        model_ms = measure(model_path, tasks, args.repeat)
+        fast_ms = measure(fast_path, tasks, args.repeat)
+        print(  # noqa: T201
+            f"{size:>6} {model_ms:>12.3f} {fast_ms:>12.3f} "
+            f"{model_ms / fast_ms:>7.1f}x",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Compare the first request latencies of a cold and a warmed up worker.
+
+A server with one uvicorn worker is started with the warm-up disabled,
+then enabled. Once it is ready, a benchmark user logs in and requests a
+task list page and a task twice, the first requests pay whatever the
+warm-up left for them. Needs the users of ``backend.benchmarks.seed``.
+
+Run with ``python -m backend.benchmarks.warmup``.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable
+
+import httpx
+
+from backend.benchmarks.load import PAGE_SIZE, VirtualUser, http_app
+from backend.benchmarks.seed import EMAIL_PATTERN
+
+# Requests timed in order, each is sent twice
+REQUESTS = ("login", "list", "detail")
+
+
+async def first_requests(warmup: bool) -> dict[str, float]:
+    """Start a server and time its first requests in milliseconds.
+
+    Args:
+        warmup (bool): Whether the server warms up.
+
+    Returns:
+        dict[str, float]: The time to ready and the time of each request,
+          the repeated ones suffixed with ``_again``.
+    """
+    start = time.perf_counter()
+    env = {"WARMUP_ENABLED": str(warmup).lower()}
+    timings = {}
+    async with http_app(None, 1, env) as (transport, url):
+        timings["ready"] = (time.perf_counter() - start) * 1000
+        async with httpx.AsyncClient(transport=transport, base_url=url) as client:
+            user = VirtualUser(client, EMAIL_PATTERN.format(0), seed=0)
+            calls: dict[str, Callable[[], Awaitable[httpx.Response]]] = {
+                "login": user.login,
+                "list": lambda: user.list_tasks(size=PAGE_SIZE),
+                "detail": lambda: client.get(f"/v1/tasks/{user.random_task_id()}"),
+            }
+            for suffix in ("", "_again"):
+                for name in REQUESTS:
+                    request_start = time.perf_counter()
+                    response = await calls[name]()
+                    elapsed = time.perf_counter() - request_start
+                    timings[name + suffix] = elapsed * 1000
+                    if response.is_server_error:
+                        raise SystemExit(f"{name} failed with {response.status_code}")
+    return timings
+
+
+def main() -> None:
+    """Print the median timings of both modes over a few server starts."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    results = {
+        mode: [asyncio.run(first_requests(mode == "warm")) for _ in range(args.runs)]
+        for mode in ("cold", "warm")
+    }
+    names = list(results["cold"][0])
+    print(f"{'median, ms':<14}" + "".join(f"{mode:>10}" for mode in results))  # noqa: T201
+    for name in names:
+        medians = (
+            statistics.median(run[name] for run in runs) for runs in results.values()
+        )
+        print(f"{name:<14}" + "".join(f"{median:>10.1f}" for median in medians))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
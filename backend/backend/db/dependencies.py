@@ -1,33 +1,65 @@
 import logging
 from typing import AsyncGenerator
 
-from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from starlette.requests import Request
 
+from backend.db.unit_of_work import commit, rollback
+from backend.services.cache.writes import recent_writes
+
 logger = logging.getLogger(__name__)
 
+# Requests that only read, served by the read replica
+READ_ONLY_METHODS = frozenset({"GET", "HEAD"})
+
+
+async def _get_session_factory(request: Request) -> async_sessionmaker[AsyncSession]:
+    """Pick the read only factory for read only requests.
+
+    The replica is used unless the user wrote recently, the user is read
+    from the access token, without the user lookup that authenticates
+    the request.
+    """
+    state = request.app.state
+    if request.method not in READ_ONLY_METHODS:
+        return state.db_session_factory
+    if state.db_replica_engine is None:
+        return state.db_read_session_factory
+
+    from backend.services.auth import ACCESS_TOKEN_NAME, auth_service  # noqa: PLC0415
+
+    user_id = auth_service.access_strategy.read_user_id(
+        request.cookies.get(ACCESS_TOKEN_NAME),
+    )
+    if user_id is not None and await recent_writes.contains(user_id):
+        return state.db_read_session_factory
+    return state.db_replica_session_factory
+
 
 async def get_db_session(
     request: Request,
 ) -> AsyncGenerator[AsyncSession, None]:
     """Create and get database session.
 
+    The session checks out a connection on its first statement, so requests
+    answered from the caches hold none. ``GET`` and ``HEAD`` requests get
+    a session in autocommit mode, without ``BEGIN`` and ``COMMIT``, of the
+    read replica if there is one, see ``RecentWrites`` for the
+    read-your-writes window. Other requests are a unit of work, committed
+    once after the endpoint returns and rolled back if it raises.
+
     Args:
         request: current request.
 
     Yields:
         sqlalchemy.ext.asyncio.AsyncSession: database session.
     """
-
-    async with request.app.state.db_session_factory() as session:
-        await session.begin()
+    session_factory = await _get_session_factory(request)
+    async with session_factory() as session:
         try:
             yield session
-        except SQLAlchemyError:
-            await session.rollback()
+        except Exception:
+            await rollback(session)
             raise
         else:
-            await session.commit()
-        finally:
-            await session.close()
+            await commit(session)
@@ -0,0 +1,48 @@
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from backend.metrics import DB_STATEMENT_DURATION
+
+STATEMENT_START = "statement_start"
+OPERATIONS = frozenset(("SELECT", "INSERT", "UPDATE", "DELETE", "WITH"))
+
+
+def _operation(statement: str) -> str:
+    """Statement kind for the metrics labels."""
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+    return keyword if keyword in OPERATIONS else "OTHER"
+
+
+def _before_cursor_execute(conn: Connection, *args: Any) -> None:
+    conn.info.setdefault(STATEMENT_START, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    *args: Any,
+) -> None:
+    start = conn.info[STATEMENT_START].pop()
+    DB_STATEMENT_DURATION.labels(_operation(statement)).observe(
+        time.perf_counter() - start,
+    )
+
+
+def _handle_error(context: ExceptionContext) -> None:
+    if context.connection is not None and context.connection.info.get(
+        STATEMENT_START,
+    ):
+        context.connection.info[STATEMENT_START].pop()
+
+
+def setup_statement_timing(engine: AsyncEngine) -> None:
+    """Record execution time of every statement run by the engine."""
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
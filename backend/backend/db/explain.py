@@ -0,0 +1,110 @@
+import asyncio
+import itertools
+import logging
+import sys
+import uuid
+from typing import Any, Iterator
+
+import ujson
+from sqlalchemy import Select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from backend.db.models import load_all_models
+from backend.log import configure_logging
+from backend.services.db.repository.tasks import RANK_SORT, TasksRepository
+from backend.settings import settings
+
+logger = logging.getLogger(__name__)
+
+SORT_FIELDS = ("title", "description", "is_done", "created_at")
+SORT_ORDERS = ("asc", "desc")
+TITLE_FILTERS = (None, "report")
+IS_DONE_FILTERS = (None, True, False)
+SEARCH_FILTERS = (None, "quarterly report")
+PAGE_SIZE = 50
+
+
+def _plan_nodes(plan: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """Walk all nodes of a JSON query plan."""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def _query_shapes(
+    repository: TasksRepository,
+    user_id: uuid.UUID,
+) -> Iterator[tuple[str, Select[Any]]]:
+    """Yield every list and count query the tasks list view can issue."""
+    for title, is_done, search in itertools.product(
+        TITLE_FILTERS,
+        IS_DONE_FILTERS,
+        SEARCH_FILTERS,
+    ):
+        filters = {
+            "title": title,
+            "is_done": is_done,
+            "search_vector": search,
+            "user_id": user_id,
+        }
+        name = f"title={title} is_done={is_done} q={search}"
+        yield f"count {name}", repository.build_count_query(filters)
+        sort_fields = SORT_FIELDS if search is None else (*SORT_FIELDS, RANK_SORT)
+        for sort_by, sort_order in itertools.product(sort_fields, SORT_ORDERS):
+            query = repository.build_list_query(filters, sort_by, sort_order)
+            yield f"list {name} sort={sort_by} {sort_order}", query.limit(PAGE_SIZE)
+
+
+async def check_query_plans() -> bool:
+    """Run EXPLAIN on each tasks list query shape.
+
+    Sequential scans are disabled for the check, so a ``Seq Scan`` on
+    ``tasks`` in any plan means no index can serve that query shape.
+
+    Returns:
+        bool: True if every query shape is served by an index.
+    """
+    load_all_models()
+    engine = create_async_engine(str(settings.db_url), echo=settings.db_echo)
+    passed = True
+    try:
+        async with engine.begin() as connection:
+            await connection.execute(text("SET LOCAL enable_seqscan = off"))
+            repository = TasksRepository(AsyncSession(connection))
+            for name, query in _query_shapes(repository, uuid.uuid4()):
+                compiled = query.compile(
+                    dialect=engine.dialect,
+                    compile_kwargs={"literal_binds": True},
+                )
+                result = await connection.exec_driver_sql(
+                    f"EXPLAIN (FORMAT JSON) {compiled}",
+                )
+                plan = ujson.loads(result.scalar_one())[0]["Plan"]
+                nodes = list(_plan_nodes(plan))
+                seq_scan = any(
+                    node["Node Type"] == "Seq Scan"
+                    and node.get("Relation Name") == "tasks"
+                    for node in nodes
+                )
+                summary = " -> ".join(
+                    node.get("Index Name", node["Node Type"]) for node in nodes
+                )
+                if seq_scan:
+                    passed = False
+                    logger.error("FAIL %s: %s", name, summary)
+                else:
+                    logger.info("ok   %s: %s", name, summary)
+    finally:
+        await engine.dispose()
+    return passed
+
+
+def main() -> None:
+    """Entrypoint of the query plan check."""
+    configure_logging()
+    if not asyncio.run(check_query_plans()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
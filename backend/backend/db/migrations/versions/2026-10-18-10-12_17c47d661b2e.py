@@ -0,0 +1,50 @@
+"""Add tasks list indexes
+
+Revision ID: 17c47d661b2e
+Revises: 35c4c30b5183
+Create Date: 2026-10-18 10:12:41.530221
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '17c47d661b2e'
+down_revision: Union[str, None] = '35c4c30b5183'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'ix_tasks_user_id_created_at_id': ['user_id', 'created_at', 'id'],
+    'ix_tasks_user_id_is_done_created_at': ['user_id', 'is_done', 'created_at'],
+    'ix_tasks_user_id_title': ['user_id', 'title'],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Build the indexes without locking the table against writes.
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.create_index(
+                name,
+                'tasks',
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.drop_index(
+                name,
+                table_name='tasks',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
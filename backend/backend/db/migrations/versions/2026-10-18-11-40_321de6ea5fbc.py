@@ -0,0 +1,82 @@
+"""Add tasks search indexes
+
+Revision ID: 321de6ea5fbc
+Revises: 17c47d661b2e
+Create Date: 2026-10-18 11:40:07.914536
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '321de6ea5fbc'
+down_revision: Union[str, None] = '17c47d661b2e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.add_column('tasks', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('simple', title), 'A') || "
+            "setweight(to_tsvector('simple', description), 'B')",
+            persisted=True,
+        ),
+        nullable=False,
+    ))
+    # Build the indexes without locking the table against writes.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_title_trgm',
+            'tasks',
+            ['title'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'title': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_tasks_description_trgm',
+            'tasks',
+            ['description'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'description': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_tasks_search_vector',
+            'tasks',
+            ['search_vector'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name in (
+            'ix_tasks_search_vector',
+            'ix_tasks_description_trgm',
+            'ix_tasks_title_trgm',
+        ):
+            op.drop_index(
+                name,
+                table_name='tasks',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+    op.drop_column('tasks', 'search_vector')
@@ -0,0 +1,32 @@
+"""Add task versions
+
+Revision ID: 1497cb7984c1
+Revises: 321de6ea5fbc
+Create Date: 2026-10-18 14:20:36.402817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1497cb7984c1'
+down_revision: Union[str, None] = '321de6ea5fbc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tasks', sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False))
+    op.add_column('tasks', sa.Column('version', sa.BigInteger(), server_default='1', nullable=False))
+    op.add_column('users', sa.Column('tasks_version', sa.BigInteger(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'tasks_version')
+    op.drop_column('tasks', 'version')
+    op.drop_column('tasks', 'updated_at')
@@ -0,0 +1,115 @@
+"""Add user task stats
+
+Revision ID: 3bba449debf7
+Revises: 1497cb7984c1
+Create Date: 2026-10-18 16:05:12.530417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3bba449debf7'
+down_revision: Union[str, None] = '1497cb7984c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Statement triggers see all rows changed by a statement in transition
+# tables, so bulk writes update each user's counts once. Deletes and
+# updates only change existing counts, as rows of deleted users are
+# already gone when their tasks are deleted.
+TRIGGERS = {
+    'insert': (
+        'NEW TABLE AS new_tasks',
+        '''
+        INSERT INTO user_task_stats AS stats (user_id, total, done)
+        SELECT user_id, count(*), count(*) FILTER (WHERE is_done)
+        FROM new_tasks
+        GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE
+        SET total = stats.total + excluded.total,
+            done = stats.done + excluded.done;
+        ''',
+    ),
+    'update': (
+        'OLD TABLE AS old_tasks NEW TABLE AS new_tasks',
+        '''
+        UPDATE user_task_stats AS stats
+        SET total = stats.total + changes.total,
+            done = stats.done + changes.done
+        FROM (
+            SELECT user_id,
+                   sum(sign) AS total,
+                   coalesce(sum(sign) FILTER (WHERE is_done), 0) AS done
+            FROM (
+                SELECT user_id, is_done, 1 AS sign FROM new_tasks
+                UNION ALL
+                SELECT user_id, is_done, -1 AS sign FROM old_tasks
+            ) AS rows
+            GROUP BY user_id
+        ) AS changes
+        WHERE stats.user_id = changes.user_id
+          AND (changes.total <> 0 OR changes.done <> 0);
+        ''',
+    ),
+    'delete': (
+        'OLD TABLE AS old_tasks',
+        '''
+        UPDATE user_task_stats AS stats
+        SET total = stats.total - changes.total,
+            done = stats.done - changes.done
+        FROM (
+            SELECT user_id, count(*) AS total, count(*) FILTER (WHERE is_done) AS done
+            FROM old_tasks
+            GROUP BY user_id
+        ) AS changes
+        WHERE stats.user_id = changes.user_id;
+        ''',
+    ),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_task_stats',
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('total', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('done', sa.BigInteger(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # Block task writes until the counts are filled and the triggers exist.
+    op.execute('LOCK TABLE tasks IN SHARE MODE')
+    for event, (transition, body) in TRIGGERS.items():
+        op.execute(f'''
+            CREATE FUNCTION user_task_stats_{event}() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                {body}
+                RETURN NULL;
+            END
+            $$
+        ''')
+        op.execute(f'''
+            CREATE TRIGGER user_task_stats_{event}
+            AFTER {event.upper()} ON tasks
+            REFERENCING {transition}
+            FOR EACH STATEMENT EXECUTE FUNCTION user_task_stats_{event}()
+        ''')
+    op.execute('''
+        INSERT INTO user_task_stats (user_id, total, done)
+        SELECT user_id, count(*), count(*) FILTER (WHERE is_done)
+        FROM tasks
+        GROUP BY user_id
+    ''')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for event in TRIGGERS:
+        op.execute(f'DROP TRIGGER user_task_stats_{event} ON tasks')
+        op.execute(f'DROP FUNCTION user_task_stats_{event}()')
+    op.drop_table('user_task_stats')
@@ -0,0 +1,81 @@
+"""Add task completion and daily stats
+
+Revision ID: acb1f738efb0
+Revises: 3bba449debf7
+Create Date: 2026-10-18 17:30:44.108263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'acb1f738efb0'
+down_revision: Union[str, None] = '3bba449debf7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tasks', sa.Column('completed_at', sa.DateTime(), nullable=True))
+    op.create_table('task_daily_stats',
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('created', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('completed', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('completion_seconds', sa.BigInteger(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+    # Block task writes until the rollup is filled.
+    op.execute('LOCK TABLE tasks IN SHARE MODE')
+    # The completion time of done tasks is unknown, their last update is
+    # the closest guess.
+    op.execute('UPDATE tasks SET completed_at = updated_at WHERE is_done')
+    op.execute('''
+        CREATE FUNCTION tasks_completed_at() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF NOT NEW.is_done THEN
+                NEW.completed_at := NULL;
+            ELSIF TG_OP = 'INSERT' THEN
+                NEW.completed_at := coalesce(NEW.completed_at, NEW.created_at);
+            ELSIF NOT OLD.is_done THEN
+                NEW.completed_at := now();
+            END IF;
+            RETURN NEW;
+        END
+        $$
+    ''')
+    op.execute('''
+        CREATE TRIGGER tasks_completed_at
+        BEFORE INSERT OR UPDATE OF is_done ON tasks
+        FOR EACH ROW EXECUTE FUNCTION tasks_completed_at()
+    ''')
+    op.execute('''
+        INSERT INTO task_daily_stats
+            (user_id, day, created, completed, completion_seconds)
+        SELECT user_id, day, sum(created), sum(completed), sum(seconds)
+        FROM (
+            SELECT user_id, created_at::date AS day,
+                   1 AS created, 0 AS completed, 0 AS seconds
+            FROM tasks
+            UNION ALL
+            SELECT user_id, completed_at::date, 0, 1,
+                   floor(extract(epoch FROM completed_at - created_at))::bigint
+            FROM tasks
+            WHERE completed_at IS NOT NULL
+        ) AS days
+        GROUP BY user_id, day
+    ''')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('task_daily_stats')
+    op.execute('DROP TRIGGER tasks_completed_at ON tasks')
+    op.execute('DROP FUNCTION tasks_completed_at()')
+    op.drop_column('tasks', 'completed_at')
@@ -0,0 +1,126 @@
+"""Maintain task daily stats with triggers
+
+Revision ID: 41ac9f844b5b
+Revises: acb1f738efb0
+Create Date: 2026-10-18 19:10:27.604113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '41ac9f844b5b'
+down_revision: Union[str, None] = 'acb1f738efb0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Changes of the daily stats from the changed tasks, added (sign 1) or
+# removed (sign -1), a task counts on its creation and completion days.
+CHANGES = '''
+    SELECT user_id, day, sum(created)::bigint AS created,
+           sum(completed)::bigint AS completed, sum(seconds)::bigint AS seconds
+    FROM (
+        SELECT user_id, created_at::date AS day, sign AS created,
+               0 AS completed, 0::bigint AS seconds
+        FROM changed_tasks
+        UNION ALL
+        SELECT user_id, completed_at::date, 0, sign,
+               sign * floor(extract(epoch FROM completed_at - created_at))::bigint
+        FROM changed_tasks
+        WHERE completed_at IS NOT NULL
+    ) AS days
+    GROUP BY user_id, day
+'''
+UPSERT = f'''
+    changes AS ({CHANGES})
+    INSERT INTO task_daily_stats AS stats
+        (user_id, day, created, completed, completion_seconds)
+    SELECT user_id, day, created, completed, seconds
+    FROM changes
+    WHERE created <> 0 OR completed <> 0 OR seconds <> 0
+    ORDER BY user_id, day
+    ON CONFLICT (user_id, day) DO UPDATE
+    SET created = stats.created + excluded.created,
+        completed = stats.completed + excluded.completed,
+        completion_seconds = stats.completion_seconds + excluded.completion_seconds;
+'''
+# Statement triggers like the user_task_stats ones, so bulk writes, the
+# COPY import and direct SQL keep the rollup exact. The rows of the days
+# are upserted in order, so concurrent statements lock them in the same
+# order. Deletes only change existing days, as rows of deleted users are
+# already gone when their tasks are deleted.
+TRIGGERS = {
+    'insert': (
+        'NEW TABLE AS new_tasks',
+        f'''
+        WITH changed_tasks AS (
+            SELECT user_id, created_at, completed_at, 1 AS sign FROM new_tasks
+        ),
+        {UPSERT}
+        ''',
+    ),
+    'update': (
+        'OLD TABLE AS old_tasks NEW TABLE AS new_tasks',
+        f'''
+        WITH changed_tasks AS (
+            SELECT user_id, created_at, completed_at, 1 AS sign FROM new_tasks
+            UNION ALL
+            SELECT user_id, created_at, completed_at, -1 AS sign FROM old_tasks
+        ),
+        {UPSERT}
+        ''',
+    ),
+    'delete': (
+        'OLD TABLE AS old_tasks',
+        f'''
+        WITH changed_tasks AS (
+            SELECT user_id, created_at, completed_at, -1 AS sign FROM old_tasks
+        ),
+        changes AS ({CHANGES})
+        UPDATE task_daily_stats AS stats
+        SET created = stats.created + changes.created,
+            completed = stats.completed + changes.completed,
+            completion_seconds = stats.completion_seconds + changes.seconds
+        FROM changes
+        WHERE stats.user_id = changes.user_id AND stats.day = changes.day;
+        ''',
+    ),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Block task writes until the rollup is rebuilt and the triggers exist.
+    op.execute('LOCK TABLE tasks IN SHARE MODE')
+    for event, (transition, body) in TRIGGERS.items():
+        op.execute(f'''
+            CREATE FUNCTION task_daily_stats_{event}() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                {body}
+                RETURN NULL;
+            END
+            $$
+        ''')
+        op.execute(f'''
+            CREATE TRIGGER task_daily_stats_{event}
+            AFTER {event.upper()} ON tasks
+            REFERENCING {transition}
+            FOR EACH STATEMENT EXECUTE FUNCTION task_daily_stats_{event}()
+        ''')
+    # Tasks written outside the service, e.g. seeded, were not counted.
+    op.execute('DELETE FROM task_daily_stats')
+    op.execute('''
+        WITH changed_tasks AS (
+            SELECT user_id, created_at, completed_at, 1 AS sign FROM tasks
+        ),
+    ''' + UPSERT)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for event in TRIGGERS:
+        op.execute(f'DROP TRIGGER task_daily_stats_{event} ON tasks')
+        op.execute(f'DROP FUNCTION task_daily_stats_{event}()')
@@ -0,0 +1,47 @@
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import BigInteger, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.db.base import Base
+
+
+class UserTaskStats(Base):
+    """Task counts of a user.
+
+    Kept exact by statement triggers on ``tasks`` in the writing
+    transaction, see the migration adding the table. Users without tasks
+    may have no row.
+    """
+
+    __tablename__ = "user_task_stats"
+
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    total: Mapped[int] = mapped_column(BigInteger, server_default="0")
+    done: Mapped[int] = mapped_column(BigInteger, server_default="0")
+
+
+class TaskDailyStats(Base):
+    """Daily rollup of a user's tasks.
+
+    Tasks are counted on the day they were created and, if done, on the day
+    they were completed. Kept exact by statement triggers on ``tasks`` in
+    the writing transaction, see the migration adding them. Days without
+    tasks have no row.
+    """
+
+    __tablename__ = "task_daily_stats"
+
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    day: Mapped[date] = mapped_column(primary_key=True)
+    created: Mapped[int] = mapped_column(BigInteger, server_default="0")
+    completed: Mapped[int] = mapped_column(BigInteger, server_default="0")
+    # Total seconds from creation to completion of the completed tasks
+    completion_seconds: Mapped[int] = mapped_column(BigInteger, server_default="0")
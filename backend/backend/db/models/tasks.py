@@ -1,8 +1,9 @@
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 from uuid import UUID
 
-from sqlalchemy import BigInteger, ForeignKey, func
+from sqlalchemy import BigInteger, Computed, FetchedValue, ForeignKey, Index, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from backend.db.base import Base
@@ -10,17 +11,63 @@ from backend.db.base import Base
 if TYPE_CHECKING:
     from backend.db.models.users import User
 
+# Text search configuration of the search vector, queries must use the same one
+SEARCH_CONFIG = "simple"
+
 
 class Task(Base):
     """Model for tasks."""
 
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index(
+            "ix_tasks_user_id_is_done_created_at",
+            "user_id",
+            "is_done",
+            "created_at",
+        ),
+        Index("ix_tasks_user_id_title", "user_id", "title"),
+        Index(
+            "ix_tasks_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_tasks_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ),
+        Index("ix_tasks_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, autoincrement=True, primary_key=True)
     title: Mapped[str]
     description: Mapped[str]
     is_done: Mapped[bool] = mapped_column(default=False)
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+    # Set by a trigger when the task becomes done, cleared when it is reopened
+    completed_at: Mapped[Optional[datetime]] = mapped_column(
+        server_default=FetchedValue(),
+        server_onupdate=FetchedValue(),
+    )
+    # Incremented by every update, the ETag of the task
+    version: Mapped[int] = mapped_column(BigInteger, server_default="1")
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', title), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', description), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
 
     user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
     user: Mapped["User"] = relationship(backref="tasks")
@@ -0,0 +1,55 @@
+import time
+from typing import Any, cast
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+from backend.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_OVERFLOW,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUTS,
+    DB_POOL_WAIT,
+)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool reporting its usage to the metrics.
+
+    Records the time spent waiting for a connection, checkout timeouts
+    and the number of checked out and overflow connections, labeled with
+    the name of the pool.
+
+    Attributes:
+        pool_name (str): The ``pool`` label of the metrics.
+    """
+
+    def __init__(self, creator: Any, pool_name: str = "primary", **kwargs: Any) -> None:
+        super().__init__(creator, **kwargs)
+        self.pool_name = pool_name
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        """Create a new pool with the same configuration and name."""
+        pool = cast("InstrumentedQueuePool", super().recreate())
+        pool.pool_name = self.pool_name
+        return pool
+
+    def _report_usage(self) -> None:
+        DB_POOL_SIZE.labels(self.pool_name).set(self.size())
+        DB_POOL_CHECKED_OUT.labels(self.pool_name).set(self.checkedout())
+        DB_POOL_OVERFLOW.labels(self.pool_name).set(max(self.overflow(), 0))
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.labels(self.pool_name).inc()
+            raise
+        finally:
+            DB_POOL_WAIT.labels(self.pool_name).observe(time.perf_counter() - start)
+            self._report_usage()
+
+    def _do_return_conn(self, record: ConnectionPoolEntry) -> None:
+        super()._do_return_conn(record)
+        self._report_usage()
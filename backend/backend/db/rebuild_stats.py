@@ -0,0 +1,47 @@
+import argparse
+import asyncio
+import logging
+import uuid
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from backend.db.models import load_all_models
+from backend.log import configure_logging
+from backend.services.db.repository.task_stats import TaskDailyStatsRepository
+from backend.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def rebuild_stats(user_id: Optional[uuid.UUID] = None) -> int:
+    """Recompute the daily task stats from the tasks.
+
+    Args:
+        user_id (Optional[uuid.UUID]): Rebuild only the stats of this user.
+
+    Returns:
+        int: The number of days with tasks.
+    """
+    load_all_models()
+    engine = create_async_engine(str(settings.db_url), echo=settings.db_echo)
+    try:
+        async with engine.begin() as connection:
+            repository = TaskDailyStatsRepository(AsyncSession(connection))
+            return await repository.rebuild(user_id)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    """Entrypoint of the daily task stats rebuild."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--user", type=uuid.UUID, help="rebuild only this user")
+    args = parser.parse_args()
+    configure_logging()
+    days = asyncio.run(rebuild_stats(args.user))
+    logger.info("Rebuilt the task stats of %d days", days)
+
+
+if __name__ == "__main__":
+    main()
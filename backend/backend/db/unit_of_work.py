@@ -0,0 +1,54 @@
+import logging
+from typing import Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+AfterCommitHook = Callable[[], Awaitable[None]]
+
+# Key of the after commit hooks in the session info
+AFTER_COMMIT = "after_commit"
+
+
+def after_commit(session: AsyncSession, hook: AfterCommitHook) -> None:
+    """
+    Run a hook once the changes of the session are committed.
+
+    The hooks are dropped if the session is rolled back.
+
+    Args:
+        session (AsyncSession): The session making the changes.
+        hook (AfterCommitHook): The hook.
+    """
+    session.info.setdefault(AFTER_COMMIT, []).append(hook)
+
+
+async def commit(session: AsyncSession) -> None:
+    """
+    Commit the session and run its after commit hooks.
+
+    Nothing is sent to the database if the session has no transaction.
+    A failing hook is logged, as the changes are already committed.
+
+    Args:
+        session (AsyncSession): The session.
+    """
+    await session.commit()
+    hooks: list[AfterCommitHook] = session.info.pop(AFTER_COMMIT, [])
+    for hook in hooks:
+        try:
+            await hook()
+        except Exception:
+            logger.exception("After commit hook failed")
+
+
+async def rollback(session: AsyncSession) -> None:
+    """
+    Roll the session back and drop its after commit hooks.
+
+    Args:
+        session (AsyncSession): The session.
+    """
+    session.info.pop(AFTER_COMMIT, None)
+    await session.rollback()
@@ -0,0 +1,66 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+HTTP_REQUESTS = Counter(
+    "http_requests",
+    "HTTP requests by route template and status code.",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route"],
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being handled by route template.",
+    ["method", "route"],
+    multiprocess_mode="livesum",
+)
+
+DB_STATEMENT_DURATION = Histogram(
+    "db_statement_duration_seconds",
+    "Database statement execution time by statement kind.",
+    ["operation"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Connections the database pool keeps open, by pool.",
+    ["pool"],
+    multiprocess_mode="liveall",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Database connections checked out of the pool, by pool.",
+    ["pool"],
+    multiprocess_mode="liveall",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Database connections open above the pool size, by pool.",
+    ["pool"],
+    multiprocess_mode="liveall",
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent getting a connection from the database pool, by pool.",
+    ["pool"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts",
+    "Database pool checkouts that timed out, by pool.",
+    ["pool"],
+)
+
+CACHE_LOOKUPS = Counter(
+    "cache_lookups",
+    "Cache lookups by cache and result.",
+    ["cache", "result"],
+)
+
+AUTH_THROTTLED = Counter(
+    "auth_throttled",
+    "Logins and registrations rejected before hashing, by reason.",
+    ["reason"],
+)
@@ -37,6 +37,7 @@ class AuthService:
             secret=settings.users_secret,
             algorithm="HS256",
             lifetime_seconds=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            trust_claims=settings.auth_stateless,
         )
         self.refresh_strategy = JWTStrategy(
             secret=settings.users_secret,
@@ -0,0 +1,67 @@
+import uuid
+from typing import Optional
+
+import ujson
+
+from backend.db.models.users import User
+from backend.metrics import CACHE_LOOKUPS
+from backend.services.cache import CacheBackend, create_cache_backend
+from backend.settings import settings
+
+
+class UserCache:
+    """Cache of verified users by id.
+
+    Only the public user fields are cached, users built from the cache
+    are detached and have no password hash.
+
+    Attributes:
+        backend (CacheBackend): The cache backend.
+        ttl (float): Seconds a user stays cached.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float) -> None:
+        self.backend = backend
+        self.ttl = ttl
+
+    async def get(self, user_id: uuid.UUID) -> Optional[User]:
+        """
+        Get a cached user.
+
+        Args:
+            user_id (uuid.UUID): The user's id.
+
+        Returns:
+            Optional[User]: The user if cached, otherwise None.
+        """
+        data = await self.backend.get(str(user_id))
+        if data is None:
+            CACHE_LOOKUPS.labels("users", "miss").inc()
+            return None
+        CACHE_LOOKUPS.labels("users", "hit").inc()
+        return User(id=user_id, email=ujson.loads(data)["email"])
+
+    async def set(self, user: User) -> None:
+        """
+        Cache a user.
+
+        Args:
+            user (User): The user to cache.
+        """
+        data = ujson.dumps({"email": user.email}).encode()
+        await self.backend.set(str(user.id), data, ttl=self.ttl)
+
+    async def invalidate(self, user_id: uuid.UUID) -> None:
+        """
+        Drop a user from the cache after it was changed.
+
+        Args:
+            user_id (uuid.UUID): The user's id.
+        """
+        await self.backend.delete(str(user_id))
+
+
+user_cache = UserCache(
+    create_cache_backend("users", max_entries=settings.user_cache_max_entries),
+    ttl=settings.user_cache_ttl,
+)
@@ -1,9 +1,11 @@
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 
 import jwt
 
 from backend.db.models.users import User
+from backend.services.auth.cache import user_cache
 from backend.services.db.service.users import UsersService
 
 
@@ -15,10 +17,49 @@ class JWTStrategy:
         secret: str,
         algorithm: str = "HS256",
         lifetime_seconds: Optional[int] = None,
+        trust_claims: bool = False,
     ) -> None:
         self.secret = secret
         self.algorithm = algorithm
         self.lifetime_seconds = lifetime_seconds
+        self.trust_claims = trust_claims
+
+    def decode(self, token: Optional[str]) -> Optional[dict[str, Any]]:
+        """
+        Decode a token.
+
+        Args:
+            token: The token from request.
+
+        Returns:
+            Optional[dict[str, Any]]: The claims if the token is valid,
+              otherwise None.
+        """
+        if token is None:
+            return None
+        try:
+            return jwt.decode(token, self.secret, algorithms=[self.algorithm])  # type: ignore
+        except jwt.PyJWTError:
+            return None
+
+    def read_user_id(self, token: Optional[str]) -> Optional[uuid.UUID]:
+        """
+        Read the user's id from a token without looking the user up.
+
+        Args:
+            token: The token from request.
+
+        Returns:
+            Optional[uuid.UUID]: The user's id if the token is valid,
+              otherwise None.
+        """
+        data = self.decode(token)
+        if data is None:
+            return None
+        try:
+            return uuid.UUID(str(data.get("sub")))
+        except ValueError:
+            return None
 
     async def read_token(
         self,
@@ -28,6 +69,9 @@ class JWTStrategy:
         """
         Read token from request and return user if token is valid.
 
+        The user is built from the token claims if they are trusted, otherwise
+        it is looked up in the user cache and then in the database.
+
         Args:
             token: The token from request.
             users_service: The users service.
@@ -35,22 +79,29 @@ class JWTStrategy:
         Returns:
             Optional[User]: The user if token is valid, otherwise None.
         """
-        if token is None:
+        data = self.decode(token)
+        if data is None:
             return None
-
-        try:
-            data = jwt.decode(token, self.secret, algorithms=[self.algorithm])  # type: ignore
-            user_id = data.get("sub")
-            if user_id is None:
-                return None
-        except jwt.PyJWTError:
+        user_id = data.get("sub")
+        if user_id is None:
             return None
 
         try:
-            return await users_service.get_by_id(users_service.parse_id(user_id))
+            user_id = users_service.parse_id(user_id)
         except ValueError:
             return None
 
+        email = data.get("email")
+        if self.trust_claims and email is not None:
+            return User(id=user_id, email=email)
+
+        user = await user_cache.get(user_id)
+        if user is None:
+            user = await users_service.get_by_id(user_id)
+            if user is not None:
+                await user_cache.set(user)
+        return user
+
     def write_token(self, user: User) -> str:
         """
         Write token for user.
@@ -61,7 +112,7 @@ class JWTStrategy:
         Returns:
             str: The token.
         """
-        payload: dict[str, Any] = {"sub": str(user.id)}
+        payload: dict[str, Any] = {"sub": str(user.id), "email": user.email}
         if self.lifetime_seconds:
             expire = datetime.now(timezone.utc) + timedelta(
                 seconds=self.lifetime_seconds,
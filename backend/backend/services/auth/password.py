@@ -1,9 +1,18 @@
-from typing import Optional
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
 
+from fastapi import HTTPException, status
 from pwdlib import PasswordHash
 from pwdlib.hashers.argon2 import Argon2Hasher
 from pwdlib.hashers.bcrypt import BcryptHasher
 
+from backend.settings import ExecutorKind, settings
+
+R = TypeVar("R")
+
+RETRY_AFTER_SECONDS = 1
+
 
 class PasswordHelper:
     """Password hashing and verification helper."""
@@ -47,3 +56,115 @@ class PasswordHelper:
             str: The hashed password.
         """
         return PasswordHelper._pwd_context.hash(password)
+
+    @staticmethod
+    async def verify_and_update_async(
+        plain_password: str,
+        hashed_password: str,
+    ) -> tuple[bool, Optional[str]]:
+        """Verify a password in the password pool.
+
+        See ``verify_and_update``.
+
+        Raises:
+            HTTPException: If the password pool is saturated.
+        """
+        return await password_pool.run(
+            PasswordHelper.verify_and_update,
+            plain_password,
+            hashed_password,
+        )
+
+    @staticmethod
+    async def hash_async(password: str) -> str:
+        """Hash a password in the password pool.
+
+        See ``hash``.
+
+        Raises:
+            HTTPException: If the password pool is saturated.
+        """
+        return await password_pool.run(PasswordHelper.hash, password)
+
+
+class PasswordPool:
+    """Bounded worker pool for password hashing.
+
+    Hashing runs in a thread or process pool instead of the event loop.
+    Calls beyond the workers and the queue size are rejected with 503,
+    so a burst of logins can't pile up unbounded work.
+
+    Attributes:
+        executor_kind (ExecutorKind): The kind of the worker pool.
+        workers (int): The number of workers.
+        queue_size (int): The number of calls allowed to wait for a worker.
+    """
+
+    def __init__(
+        self,
+        executor_kind: ExecutorKind,
+        workers: int,
+        queue_size: int,
+    ) -> None:
+        self.executor_kind = executor_kind
+        self.workers = workers
+        self.queue_size = queue_size
+        self.in_flight = 0
+        self._executor: Optional[Executor] = None
+
+    @property
+    def executor(self) -> Executor:
+        """The worker pool, created on first use."""
+        if self._executor is None:
+            if self.executor_kind == ExecutorKind.PROCESS:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="password",
+                )
+        return self._executor
+
+    @property
+    def saturated(self) -> bool:
+        """Whether all workers are busy and the queue is full."""
+        return self.in_flight >= self.workers + self.queue_size
+
+    async def run(self, fn: Callable[..., R], *args: Any) -> R:
+        """Run the function in the worker pool.
+
+        Args:
+            fn (Callable[..., R]): The function, picklable for process pools.
+            *args: The function arguments.
+
+        Returns:
+            R: The function result.
+
+        Raises:
+            HTTPException: If the pool is saturated.
+        """
+        if self.saturated:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Сервер перегружен, попробуйте позже",
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+            )
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+
+    def shutdown(self) -> None:
+        """Stop the workers."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_pool = PasswordPool(
+    executor_kind=settings.password_hasher_executor,
+    workers=settings.password_hasher_workers,
+    queue_size=settings.password_hasher_queue_size,
+)
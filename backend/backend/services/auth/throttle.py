@@ -0,0 +1,94 @@
+import hashlib
+import math
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from backend.metrics import AUTH_THROTTLED
+from backend.services.auth.password import RETRY_AFTER_SECONDS, password_pool
+from backend.services.throttle import ThrottleBackend, create_throttle_backend
+from backend.settings import settings
+
+
+class AuthThrottle:
+    """Admission control of the requests that hash a password.
+
+    Logins and registrations are rejected before any hashing when the
+    password pool is saturated, with 503, or when the client IP or the
+    email ran out of attempts, with 429. The email bucket stops credential
+    stuffing spread over many IPs, the IP bucket stops one client trying
+    many emails.
+
+    Attributes:
+        backend (ThrottleBackend): The token buckets.
+        enabled (bool): Whether the attempts are throttled.
+        ip_rate (float): Attempts per second refilled for each IP.
+        ip_burst (int): Attempts an IP can make at once.
+        email_rate (float): Attempts per second refilled for each email.
+        email_burst (int): Attempts an email can get at once.
+    """
+
+    def __init__(
+        self,
+        backend: ThrottleBackend,
+        enabled: bool,
+        ip_rate: float,
+        ip_burst: int,
+        email_rate: float,
+        email_burst: int,
+    ) -> None:
+        self.backend = backend
+        self.enabled = enabled
+        self.ip_rate = ip_rate
+        self.ip_burst = ip_burst
+        self.email_rate = email_rate
+        self.email_burst = email_burst
+
+    @staticmethod
+    def _email_key(email: str) -> str:
+        """Key of an email bucket, emails are not stored as they are."""
+        return hashlib.sha256(email.strip().lower().encode()).hexdigest()
+
+    async def check(self, ip: Optional[str], email: str) -> None:
+        """
+        Admit an attempt of the client to hash the password of an email.
+
+        Args:
+            ip (Optional[str]): The client IP, None if unknown.
+            email (str): The email logging in or registering.
+
+        Raises:
+            HTTPException: If the password pool is saturated or the attempt
+              is throttled, with the seconds to wait in ``Retry-After``.
+        """
+        if password_pool.saturated:
+            AUTH_THROTTLED.labels("pool").inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Сервер перегружен, попробуйте позже",
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+            )
+        if not self.enabled:
+            return
+        buckets = [("email", self._email_key(email), self.email_rate, self.email_burst)]
+        if ip is not None:
+            buckets.insert(0, ("ip", ip, self.ip_rate, self.ip_burst))
+        for kind, key, rate, burst in buckets:
+            wait = await self.backend.take(f"{kind}:{key}", rate, burst)
+            if wait > 0:
+                AUTH_THROTTLED.labels(kind).inc()
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Слишком много попыток, попробуйте позже",
+                    headers={"Retry-After": str(math.ceil(wait))},
+                )
+
+
+auth_throttle = AuthThrottle(
+    create_throttle_backend("auth", max_keys=settings.auth_throttle_max_keys),
+    enabled=settings.auth_throttle_enabled,
+    ip_rate=settings.auth_throttle_ip_per_minute / 60,
+    ip_burst=settings.auth_throttle_ip_burst,
+    email_rate=settings.auth_throttle_email_per_minute / 60,
+    email_burst=settings.auth_throttle_email_burst,
+)
@@ -0,0 +1,112 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+from backend.settings import settings
+
+
+class CacheBackend(ABC):
+    """Key-value cache backend storing bytes with an optional TTL."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get a value, None if it is missing or expired."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Set a value, expiring after ``ttl`` seconds if given."""
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        """Delete values."""
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Release the backend resources."""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU cache backend.
+
+    Entries are evicted in least recently used order once there are more
+    than ``max_entries`` of them or their values take more than
+    ``max_bytes``.
+
+    Attributes:
+        max_entries (int): The maximum number of entries.
+        max_bytes (Optional[int]): The maximum total size of the values.
+        size (int): The current total size of the values.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: Optional[int] = None) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[str, tuple[bytes, Optional[float]]] = OrderedDict()
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[0])
+
+    def _over_limit(self) -> bool:
+        if len(self._entries) > self.max_entries:
+            return True
+        return self.max_bytes is not None and self.size > self.max_bytes
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get a value, None if it is missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Set a value, expiring after ``ttl`` seconds if given."""
+        self._pop(key)
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        self._entries[key] = (value, expires_at)
+        self.size += len(value)
+        while self._entries and self._over_limit():
+            self._pop(next(iter(self._entries)))
+
+    async def delete(self, *keys: str) -> None:
+        """Delete values."""
+        for key in keys:
+            self._pop(key)
+
+    async def close(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+        self.size = 0
+
+
+def create_cache_backend(
+    namespace: str,
+    max_entries: int,
+    max_bytes: Optional[int] = None,
+) -> CacheBackend:
+    """Create a cache backend for the given namespace.
+
+    The backend is shared by all workers if ``cache_url`` is set,
+    otherwise it is an in-process LRU cache.
+
+    Args:
+        namespace (str): The prefix of the keys in a shared backend.
+        max_entries (int): The entries limit of an in-process backend.
+        max_bytes (Optional[int]): The size limit of an in-process backend.
+
+    Returns:
+        CacheBackend: The cache backend.
+    """
+    if settings.cache_url:
+        from backend.services.cache.redis import RedisCacheBackend  # noqa: PLC0415
+
+        return RedisCacheBackend(settings.cache_url, prefix=f"{namespace}:")
+    return MemoryCacheBackend(max_entries, max_bytes)
@@ -0,0 +1,41 @@
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from backend.services.cache import CacheBackend
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis cache backend shared by all workers.
+
+    Requires the ``redis`` extra.
+
+    Attributes:
+        client (Redis): The redis client.
+        prefix (str): The prefix of all keys.
+    """
+
+    def __init__(self, url: str, prefix: str = "") -> None:
+        self.client = Redis.from_url(url)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get a value, None if it is missing or expired."""
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Set a value, expiring after ``ttl`` seconds if given."""
+        await self.client.set(
+            self.prefix + key,
+            value,
+            px=None if ttl is None else int(ttl * 1000),
+        )
+
+    async def delete(self, *keys: str) -> None:
+        """Delete values."""
+        if keys:
+            await self.client.delete(*(self.prefix + key for key in keys))
+
+    async def close(self) -> None:
+        """Close the redis connections."""
+        await self.client.aclose()
@@ -0,0 +1,107 @@
+import hashlib
+import uuid
+from typing import Any, Optional, Sequence
+
+import ujson
+from pydantic_core import from_json, to_json
+from sqlalchemy.engine import Row
+from sqlalchemy.engine.result import result_tuple
+
+from backend.metrics import CACHE_LOOKUPS
+from backend.services.cache import CacheBackend, create_cache_backend
+from backend.settings import settings
+
+TaskListPage = tuple[Sequence[Row[Any]], int, Optional[str]]
+
+
+class TaskListCache:
+    """Cache of task list pages.
+
+    Pages are cached by the user, the version of the user's tasks and the
+    list parameters. Any change of the user's tasks increments the version,
+    so pages of older versions are never read again and expire.
+
+    Only pages of column projections are cached, values of the cached
+    rows are JSON types, e.g. datetimes are ISO strings.
+
+    Attributes:
+        backend (CacheBackend): The cache backend.
+        ttl (float): Seconds a page stays cached.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float) -> None:
+        self.backend = backend
+        self.ttl = ttl
+
+    @staticmethod
+    def key(user_id: uuid.UUID, tasks_version: int, params: Sequence[Any]) -> str:
+        """
+        Build the key of a page.
+
+        Args:
+            user_id (uuid.UUID): The user's id.
+            tasks_version (int): The version of the user's tasks.
+            params (Sequence[Any]): JSON serializable parameters of the list.
+
+        Returns:
+            str: The cache key.
+        """
+        digest = hashlib.sha256(ujson.dumps(params).encode()).hexdigest()[:32]
+        return f"{user_id}:{tasks_version}:{digest}"
+
+    async def get(self, key: str) -> Optional[TaskListPage]:
+        """
+        Get a cached page.
+
+        Args:
+            key (str): The key of the page.
+
+        Returns:
+            Optional[TaskListPage]: The rows, the total count and the cursor of
+              the next page if cached, otherwise None.
+        """
+        data = await self.backend.get(key)
+        if data is None:
+            CACHE_LOOKUPS.labels("tasks", "miss").inc()
+            return None
+        CACHE_LOOKUPS.labels("tasks", "hit").inc()
+        page = from_json(data)
+        make_row = result_tuple(page["fields"])
+        rows = [make_row(values) for values in page["rows"]]
+        return rows, page["total"], page["next_cursor"]
+
+    async def set(
+        self,
+        key: str,
+        rows: Sequence[Row[Any]],
+        total: int,
+        next_cursor: Optional[str],
+    ) -> None:
+        """
+        Cache a page.
+
+        Args:
+            key (str): The key of the page.
+            rows (Sequence[Row[Any]]): The rows of the page.
+            total (int): The total count.
+            next_cursor (Optional[str]): The cursor of the next page.
+        """
+        data = to_json(
+            {
+                "fields": list(rows[0]._fields) if rows else [],
+                "rows": [tuple(row) for row in rows],
+                "total": total,
+                "next_cursor": next_cursor,
+            },
+        )
+        await self.backend.set(key, data, ttl=self.ttl)
+
+
+task_list_cache = TaskListCache(
+    create_cache_backend(
+        "tasks",
+        max_entries=settings.tasks_cache_max_entries,
+        max_bytes=settings.tasks_cache_max_bytes,
+    ),
+    ttl=settings.tasks_cache_ttl,
+)
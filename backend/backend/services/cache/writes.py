@@ -0,0 +1,64 @@
+import uuid
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.db.unit_of_work import after_commit
+from backend.services.cache import CacheBackend, create_cache_backend
+from backend.settings import settings
+
+
+class RecentWrites:
+    """Users who changed their data within the read-your-writes window.
+
+    The read replica may lag behind the primary, so the requests of these
+    users read from the primary until the window ends. The window is only
+    shared by all workers if the cache backend is.
+
+    Attributes:
+        backend (CacheBackend): The cache backend.
+        window (float): Seconds a user reads from the primary after a write.
+    """
+
+    def __init__(self, backend: CacheBackend, window: float) -> None:
+        self.backend = backend
+        self.window = window
+
+    async def mark(self, user_id: uuid.UUID) -> None:
+        """
+        Start the window of a user.
+
+        Args:
+            user_id (uuid.UUID): The user who wrote.
+        """
+        await self.backend.set(str(user_id), b"1", ttl=self.window)
+
+    def mark_after_commit(self, session: AsyncSession, user_id: uuid.UUID) -> None:
+        """
+        Start the window of a user once the session's changes are committed.
+
+        Nothing is marked without a read replica.
+
+        Args:
+            session (AsyncSession): The session with the user's changes.
+            user_id (uuid.UUID): The user who wrote.
+        """
+        if settings.db_replica_host is not None:
+            after_commit(session, lambda: self.mark(user_id))
+
+    async def contains(self, user_id: uuid.UUID) -> bool:
+        """
+        Check if the user is within the window.
+
+        Args:
+            user_id (uuid.UUID): The user's id.
+
+        Returns:
+            bool: True if the user wrote within the window.
+        """
+        return await self.backend.get(str(user_id)) is not None
+
+
+recent_writes = RecentWrites(
+    create_cache_backend("writes", max_entries=settings.db_replica_max_writers),
+    window=settings.db_replica_read_your_writes,
+)
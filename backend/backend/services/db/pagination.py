@@ -0,0 +1,83 @@
+import base64
+import hashlib
+import hmac
+from datetime import datetime
+from typing import Any, Optional
+
+import ujson
+from fastapi import HTTPException, status
+
+from backend.settings import settings
+
+SIGNATURE_SIZE = 16
+
+
+def _sign(payload: bytes) -> str:
+    digest = hmac.new(
+        settings.users_secret.encode(),
+        b"cursor:" + payload,
+        hashlib.sha256,
+    ).digest()[:SIGNATURE_SIZE]
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def encode_cursor(
+    sort_by: Optional[str],
+    sort_order: str,
+    value: Any,
+    item_id: int,
+) -> str:
+    """Encode the last seen keyset position into an opaque signed cursor.
+
+    Args:
+        sort_by (Optional[str]): The field the page was sorted by.
+        sort_order (str): The sort order of the page.
+        value (Any): The sort field value of the last item.
+        item_id (int): The primary key of the last item.
+
+    Returns:
+        str: The cursor to continue from.
+    """
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = base64.urlsafe_b64encode(
+        ujson.dumps([sort_by, sort_order.lower(), value, item_id]).encode(),
+    ).rstrip(b"=")
+    return f"{payload.decode()}.{_sign(payload)}"
+
+
+def decode_cursor(
+    cursor: str,
+    sort_by: Optional[str],
+    sort_order: str,
+) -> tuple[Any, int]:
+    """Verify a cursor and return the keyset position it encodes.
+
+    Args:
+        cursor (str): The cursor returned with the previous page.
+        sort_by (Optional[str]): The field the current page is sorted by.
+        sort_order (str): The sort order of the current page.
+
+    Returns:
+        tuple[Any, int]: The sort field value and primary key of the last item.
+
+    Raises:
+        HTTPException: If the cursor is malformed, forged or was issued for
+          another sorting.
+    """
+    invalid = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Неверный курсор",
+    )
+    payload, _, signature = cursor.encode().partition(b".")
+    if not hmac.compare_digest(signature, _sign(payload).encode()):
+        raise invalid
+    try:
+        padding = b"=" * (-len(payload) % 4)
+        data = ujson.loads(base64.urlsafe_b64decode(payload + padding))
+        cursor_sort_by, cursor_sort_order, value, item_id = data
+    except ValueError as e:
+        raise invalid from e
+    if cursor_sort_by != sort_by or cursor_sort_order != sort_order.lower():
+        raise invalid
+    return value, item_id
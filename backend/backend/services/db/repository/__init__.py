@@ -1,6 +1,7 @@
 from typing import (
     Any,
     Generic,
+    Iterable,
     Optional,
     Type,
     TypeVar,
@@ -14,6 +15,7 @@ from sqlalchemy import (
     update,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Bundle
 
 from backend.db.base import Base
 
@@ -40,6 +42,23 @@ class BaseRepository(Generic[T]):
         """
         self.session = session
 
+    def projection(self, fields: Iterable[str]) -> Bundle[Any]:
+        """Bundle of only the given columns of the model.
+
+        Selecting a bundle instead of the model returns read only rows,
+        they are not added to the identity map and have no state tracking.
+
+        Args:
+            fields: Names of the columns to select
+
+        Returns:
+            Bundle of the columns, its rows have them as attributes
+        """
+        return Bundle(
+            self.model.__tablename__,
+            *(getattr(self.model, field) for field in fields),
+        )
+
     async def add(self, **values: Any) -> T:
         """Create new record with given values.
 
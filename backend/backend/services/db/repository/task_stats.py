@@ -0,0 +1,115 @@
+from datetime import date
+from typing import Any, Optional, Sequence, cast
+from uuid import UUID
+
+from sqlalchemy import (
+    BigInteger,
+    CursorResult,
+    Date,
+    delete,
+    func,
+    literal,
+    select,
+    text,
+)
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.db.models.task_stats import TaskDailyStats, UserTaskStats
+from backend.db.models.tasks import Task
+from backend.services.db.repository import BaseRepository
+
+
+class TaskDailyStatsRepository(BaseRepository[TaskDailyStats]):
+    """Repository for the daily task stats.
+
+    The stats are kept up to date by triggers on ``tasks``.
+    """
+
+    model = TaskDailyStats
+
+    async def find_days(
+        self,
+        user_id: UUID,
+        date_from: date,
+        date_to: date,
+    ) -> Sequence[TaskDailyStats]:
+        """Get the user's days with tasks in a date range.
+
+        Args:
+            user_id (UUID): The owner of the tasks.
+            date_from (date): The first day.
+            date_to (date): The last day.
+
+        Returns:
+            Sequence[TaskDailyStats]: The days in order.
+        """
+        result = await self.session.scalars(
+            select(self.model)
+            .where(
+                self.model.user_id == user_id,
+                self.model.day.between(date_from, date_to),
+            )
+            .order_by(self.model.day),
+        )
+        return result.all()
+
+    async def find_user_stats(self, user_id: UUID) -> Optional[UserTaskStats]:
+        """Get the task counts of the user.
+
+        Args:
+            user_id (UUID): The user's id.
+
+        Returns:
+            Optional[UserTaskStats]: The counts, None if the user has no tasks.
+        """
+        return await self.session.get(UserTaskStats, user_id)
+
+    async def rebuild(self, user_id: Optional[UUID] = None) -> int:
+        """Recompute the daily stats from the tasks.
+
+        Task writes wait until the transaction ends, so no change is lost.
+
+        Args:
+            user_id (Optional[UUID]): Rebuild only the stats of this user.
+
+        Returns:
+            int: The number of days with tasks.
+        """
+        await self.session.execute(text("LOCK TABLE tasks IN SHARE MODE"))
+        removed = delete(self.model)
+        created = select(
+            Task.user_id,
+            Task.created_at.cast(Date).label("day"),
+            literal(1).label("created"),
+            literal(0).label("completed"),
+            literal(0).label("seconds"),
+        )
+        completed = select(
+            Task.user_id,
+            Task.completed_at.cast(Date),
+            literal(0),
+            literal(1),
+            func.floor(
+                func.extract("epoch", Task.completed_at - Task.created_at),
+            ).cast(BigInteger),
+        ).where(Task.completed_at.is_not(None))
+        if user_id is not None:
+            removed = removed.where(self.model.user_id == user_id)
+            created = created.where(Task.user_id == user_id)
+            completed = completed.where(Task.user_id == user_id)
+        await self.session.execute(removed)
+
+        days = created.union_all(completed).subquery("days")
+        result = await self.session.execute(
+            insert(self.model).from_select(
+                ["user_id", "day", "created", "completed", "completion_seconds"],
+                select(
+                    days.c.user_id,
+                    days.c.day,
+                    func.sum(days.c.created),
+                    func.sum(days.c.completed),
+                    func.sum(days.c.seconds),
+                ).group_by(days.c.user_id, days.c.day),
+            ),
+        )
+        return cast("CursorResult[Any]", result).rowcount
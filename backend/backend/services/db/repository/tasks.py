@@ -1,18 +1,78 @@
-from typing import Any, Callable, Dict, Optional, Sequence
+from datetime import datetime
+from typing import Any, AsyncGenerator, Callable, Dict, Optional, Sequence, cast
+from uuid import UUID
 
-from sqlalchemy import ColumnElement, func, select
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    ColumnElement,
+    CursorResult,
+    Select,
+    String,
+    Uuid,
+    any_,
+    column,
+    delete,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    table,
+    text,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql.dml import ReturningUpdate
 
-from backend.db.models.tasks import Task
+from backend.db.models.task_stats import UserTaskStats
+from backend.db.models.tasks import SEARCH_CONFIG, Task
 from backend.services.db.repository import BaseRepository
+from backend.settings import SearchMode, settings
 
 FilterFnsType = Dict[InstrumentedAttribute[Any], Callable[[Any], ColumnElement[bool]]]
 
+# Filters whose counts are kept in the user's task stats
+STATS_FILTERS = frozenset({"user_id", "is_done"})
+
+# Sorts by relevance to the full text search filter
+RANK_SORT = "rank"
+
+# Temporary table of the tasks of an import, in the order of the upload
+import_table = table(
+    "tasks_import",
+    column("line", BigInteger),
+    column("title", String),
+    column("description", String),
+    column("is_done", Boolean),
+)
+
+
+def _contains(column: InstrumentedAttribute[str], value: str) -> ColumnElement[bool]:
+    """Substring match in the configured search mode."""
+    if settings.tasks_search_mode == SearchMode.ILIKE:
+        return column.icontains(value)
+    return column.contains(value)
+
+
+def _search_query(value: str) -> ColumnElement[Any]:
+    """Parse a web search style full text query."""
+    config: ColumnElement[Any] = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+    return func.websearch_to_tsquery(config, value)
+
+
 filter_fns: FilterFnsType = {
-    Task.title: lambda value: Task.title.contains(value),
-    Task.description: lambda value: Task.description.contains(value),
+    Task.title: lambda value: _contains(Task.title, value),
+    Task.description: lambda value: _contains(Task.description, value),
     Task.is_done: lambda value: Task.is_done.is_(value),
-    Task.user_id: lambda value: Task.user_id == value
+    Task.user_id: lambda value: Task.user_id == value,
+    Task.search_vector: lambda value: Task.search_vector.bool_op("@@")(
+        _search_query(value),
+    ),
 }
 
 
@@ -21,6 +81,123 @@ class TasksRepository(BaseRepository[Task]):
 
     model = Task
 
+    def _apply_filters(
+        self,
+        query: Select[Any],
+        filters: Optional[Dict[str, Any]],
+    ) -> Select[Any]:
+        """Add the where clauses for the given filters to the query."""
+        if filters:
+            for key, value in filters.items():
+                if value is not None and hasattr(self.model, key):
+                    query = query.where(filter_fns[getattr(self.model, key)](value))
+        return query
+
+    def _keyset_predicate(
+        self,
+        sort_column: Optional[InstrumentedAttribute[Any]],
+        descending: bool,
+        after: tuple[Any, int],
+    ) -> ColumnElement[bool]:
+        """Build the predicate selecting rows after the given keyset position."""
+        value, last_id = after
+        if sort_column is None:
+            left, right = tuple_(self.model.id), tuple_(last_id)
+        else:
+            if isinstance(value, str) and sort_column.type.python_type is datetime:
+                value = datetime.fromisoformat(value)
+            left = tuple_(sort_column, self.model.id)
+            right = tuple_(value, last_id)
+        return left < right if descending else left > right
+
+    def build_list_query(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        sort_by: Optional[str] = None,
+        sort_order: str = "asc",
+        after: Optional[tuple[Any, int]] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Select[Any]:
+        """Build the filtered and sorted tasks query without pagination.
+
+        The primary key is always used as a tie breaker, so the order is
+        stable and keyset pagination can continue from any row. Sorting by
+        ``rank`` orders by relevance to the ``search_vector`` filter.
+        With ``fields`` only those columns are selected, see ``projection``.
+        """
+        entity = self.model if fields is None else self.projection(fields)
+        query = self._apply_filters(select(entity), filters)
+
+        search = (filters or {}).get("search_vector")
+        if sort_by == RANK_SORT and search is not None:
+            rank = func.ts_rank(self.model.search_vector, _search_query(search))
+            return query.order_by(rank.desc(), self.model.id.desc())
+
+        sort_column = None
+        if sort_by and hasattr(self.model, sort_by):
+            sort_column = getattr(self.model, sort_by)
+        descending = sort_order.lower() == "desc"
+
+        if after is not None:
+            query = query.where(self._keyset_predicate(sort_column, descending, after))
+
+        order_columns = [self.model.id]
+        if sort_column is not None:
+            order_columns.insert(0, sort_column)
+        if descending:
+            return query.order_by(*(column.desc() for column in order_columns))
+        return query.order_by(*(column.asc() for column in order_columns))
+
+    def _stats_count(
+        self,
+        filters: Optional[Dict[str, Any]],
+    ) -> Optional[ColumnElement[int]]:
+        """Read the count from the user's task stats, if the filters allow.
+
+        Only counts of a user's tasks, all or filtered by ``is_done``, are
+        kept in the stats.
+        """
+        filters = filters or {}
+        keys = {
+            key
+            for key, value in filters.items()
+            if value is not None and hasattr(self.model, key)
+        }
+        if "user_id" not in keys or not keys <= STATS_FILTERS:
+            return None
+        is_done = filters.get("is_done")
+        count: ColumnElement[int] | InstrumentedAttribute[int]
+        if is_done is None:
+            count = UserTaskStats.total
+        elif is_done:
+            count = UserTaskStats.done
+        else:
+            count = UserTaskStats.total - UserTaskStats.done
+        stats = select(count).where(UserTaskStats.user_id == filters["user_id"])
+        return func.coalesce(stats.scalar_subquery(), 0)
+
+    def build_count_query(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+    ) -> Select[Any]:
+        """Build the query counting the tasks matching the filters.
+
+        The counts of a user's tasks, all or filtered by ``is_done``, are
+        read from ``UserTaskStats`` and exact. Otherwise counting stops once
+        ``limit`` tasks matched if it is given.
+        """
+        stats_count = self._stats_count(filters)
+        if stats_count is not None:
+            return select(stats_count)
+        if limit is None:
+            return self._apply_filters(
+                select(func.count()).select_from(self.model),
+                filters,
+            )
+        matched = self._apply_filters(select(self.model.id), filters).limit(limit)
+        return select(func.count()).select_from(matched.subquery())
+
     async def find_all(
         self,
         filters: Optional[Dict[str, Any]] = None,
@@ -28,34 +205,298 @@ class TasksRepository(BaseRepository[Task]):
         sort_order: str = "asc",
         page: int = 1,
         size: int = 50,
-    ) -> tuple[Sequence[Task], int]:
-        """Get all tasks with filters, sorting and pagination."""
-        query = select(self.model)
+        after: Optional[tuple[Any, int]] = None,
+        total_limit: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> tuple[Sequence[Task | Row[Any]], int]:
+        """Get all tasks with filters, sorting and pagination.
 
-        if filters:
-            for key, value in filters.items():
-                if value is not None and hasattr(self.model, key):
-                    query = query.where(filter_fns[getattr(self.model, key)](value))
+        When ``after`` is given the page starts right after that
+        ``(sort value, id)`` position instead of skipping ``page - 1`` pages.
+        When ``fields`` are given the tasks are read only rows of only those
+        columns instead of ``Task`` instances.
 
-        if sort_by and hasattr(self.model, sort_by):
-            sort_column = getattr(self.model, sort_by)
-            if sort_order.lower() == "desc":
-                query = query.order_by(sort_column.desc())
-            else:
-                query = query.order_by(sort_column.asc())
+        The total is selected as a scalar subquery of the page statement, so
+        both take one round trip. With ``total_limit`` counting stops after
+        ``total_limit + 1`` tasks, so a total above the limit means "more".
+        """
+        count_query = self.build_count_query(
+            filters,
+            None if total_limit is None else total_limit + 1,
+        )
+        query = self.build_list_query(filters, sort_by, sort_order, after, fields)
+        query = query.add_columns(count_query.scalar_subquery().correlate(None))
+        if after is None:
+            query = query.offset((page - 1) * size)
+        query = query.limit(size)
 
-        count_query = select(func.count()).select_from(self.model)
-        if filters:
-            for key, value in filters.items():
-                if value is not None and hasattr(self.model, key):
-                    count_query = count_query.where(
-                        filter_fns[getattr(self.model, key)](value)
-                    )
-        total = await self.session.scalar(count_query) or 0
+        rows = (await self.session.execute(query)).all()
+        if rows:
+            return [row[0] for row in rows], rows[0][1]
+        if after is None and page == 1:
+            return [], 0
+        # Past the last page, there is no row to carry the total
+        return [], await self.session.scalar(count_query) or 0
+
+    async def stream_all(
+        self,
+        filters: Optional[Dict[str, Any]],
+        fields: Sequence[str],
+        batch_size: int,
+    ) -> AsyncGenerator[Sequence[Row[Any]], None]:
+        """Stream all tasks matching the filters in ID order.
+
+        The rows are fetched through a server side cursor in batches, so
+        memory stays bounded however many tasks match.
+
+        Args:
+            filters (Optional[Dict[str, Any]]): The filters to apply.
+            fields (Sequence[str]): The columns to load, see ``projection``.
+            batch_size (int): The number of rows fetched at once.
+
+        Yields:
+            Sequence[Row[Any]]: The next batch of tasks.
+        """
+        query = self.build_list_query(filters, fields=fields)
+        result = await self.session.stream(
+            query.execution_options(yield_per=batch_size),
+        )
+        async for rows in result.partitions():
+            yield [row[0] for row in rows]
+
+    async def find_one_or_none_for_user(
+        self,
+        task_id: int,
+        user_id: UUID,
+    ) -> Optional[Task]:
+        """Get the user's task by ID.
+
+        Args:
+            task_id (int): The task ID.
+            user_id (UUID): The owner of the task.
+
+        Returns:
+            Optional[Task]: The task, None if not found or owned by another user.
+        """
+        return await self.session.scalar(
+            select(self.model).where(
+                self.model.id == task_id,
+                self.model.user_id == user_id,
+            ),
+        )
+
+    async def update_for_user(
+        self,
+        task_id: int,
+        user_id: UUID,
+        versions: Optional[Sequence[int]] = None,
+        **update_data: Any,
+    ) -> Optional[Task]:
+        """Update the user's task by ID and increment its version.
+
+        Args:
+            task_id (int): The task ID.
+            user_id (UUID): The owner of the task.
+            versions (Optional[Sequence[int]]): Update only if the task has one
+              of these versions.
+            **update_data: Field-value pairs to update.
+
+        Returns:
+            Optional[Task]: The updated task, None if not found, owned by
+              another user or of another version.
+        """
+        if not update_data:
+            task = await self.find_one_or_none_for_user(task_id, user_id)
+            if task is None or versions is None or task.version in versions:
+                return task
+            return None
+        query = update(self.model).where(
+            self.model.id == task_id,
+            self.model.user_id == user_id,
+        )
+        if versions is not None:
+            query = query.where(self.model.version.in_(versions))
+        return await self.session.scalar(
+            query.values(**update_data, version=self.model.version + 1).returning(
+                self.model,
+            ),
+        )
+
+    async def delete_for_user(self, task_id: int, user_id: UUID) -> bool:
+        """Delete the user's task by ID.
+
+        Args:
+            task_id (int): The task ID.
+            user_id (UUID): The owner of the task.
+
+        Returns:
+            bool: False if the task was not found or is owned by another user.
+        """
+        deleted_id = await self.session.scalar(
+            delete(self.model)
+            .where(self.model.id == task_id, self.model.user_id == user_id)
+            .returning(self.model.id),
+        )
+        return deleted_id is not None
+
+    async def add_many(
+        self,
+        user_id: UUID,
+        items: Sequence[Dict[str, Any]],
+    ) -> Sequence[Task]:
+        """Create the user's tasks with multi-row inserts.
+
+        Args:
+            user_id (UUID): The owner of the tasks.
+            items (Sequence[Dict[str, Any]]): The values of each task.
+
+        Returns:
+            Sequence[Task]: The created tasks in the order of ``items``.
+        """
+        if not items:
+            return []
+        result = await self.session.scalars(
+            insert(self.model).returning(self.model, sort_by_parameter_order=True),
+            [{**item, "user_id": user_id} for item in items],
+        )
+        return result.all()
+
+    def build_update_many_query(
+        self,
+        user_id: UUID,
+        changes: Dict[int, Dict[str, Any]],
+    ) -> ReturningUpdate[Task]:
+        """Build the statement partially updating the user's tasks.
+
+        The changes are joined as a ``VALUES`` list, fields missing from
+        a change keep their value. The columns are cast to the task column
+        types, Postgres types a ``VALUES`` column of only ``NULL`` as text.
+        Tasks of other users are not updated.
+        """
+        rows = values(
+            column("id", BigInteger),
+            column("title", String),
+            column("description", String),
+            column("is_done", Boolean),
+            name="changes",
+        ).data(
+            [
+                (
+                    task_id,
+                    change.get("title"),
+                    change.get("description"),
+                    change.get("is_done"),
+                )
+                for task_id, change in changes.items()
+            ],
+        )
+        return (
+            update(self.model)
+            .where(self.model.id == rows.c.id, self.model.user_id == user_id)
+            .values(
+                title=func.coalesce(rows.c.title.cast(String), self.model.title),
+                description=func.coalesce(
+                    rows.c.description.cast(String),
+                    self.model.description,
+                ),
+                is_done=func.coalesce(rows.c.is_done.cast(Boolean), self.model.is_done),
+                version=self.model.version + 1,
+            )
+            .returning(self.model)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def update_many(
+        self,
+        user_id: UUID,
+        changes: Dict[int, Dict[str, Any]],
+    ) -> Sequence[Task]:
+        """Partially update the user's tasks in one statement.
+
+        See ``build_update_many_query``.
+
+        Args:
+            user_id (UUID): The owner of the tasks.
+            changes (Dict[int, Dict[str, Any]]): The changed fields by task ID.
+
+        Returns:
+            Sequence[Task]: The updated tasks, in no particular order.
+        """
+        if not changes:
+            return []
+        result = await self.session.scalars(
+            self.build_update_many_query(user_id, changes),
+        )
+        return result.all()
+
+    async def delete_many(self, user_id: UUID, ids: Sequence[int]) -> Sequence[int]:
+        """Delete the user's tasks in one statement.
+
+        Args:
+            user_id (UUID): The owner of the tasks.
+            ids (Sequence[int]): The task IDs.
+
+        Returns:
+            Sequence[int]: The IDs of the deleted tasks.
+        """
+        if not ids:
+            return []
+        result = await self.session.scalars(
+            delete(self.model)
+            .where(
+                self.model.id == any_(literal(list(ids), ARRAY(BigInteger))),
+                self.model.user_id == user_id,
+            )
+            .returning(self.model.id),
+        )
+        return result.all()
+
+    async def create_import_table(self) -> None:
+        """Create the import table, it is dropped when the transaction ends."""
+        await self.session.execute(
+            text(
+                f"CREATE TEMPORARY TABLE {import_table.name} "
+                "(line bigint, title varchar, description varchar, is_done boolean) "
+                "ON COMMIT DROP",
+            ),
+        )
+
+    async def copy_to_import_table(self, records: Sequence[tuple[Any, ...]]) -> None:
+        """Load tasks into the import table with ``COPY``.
+
+        Args:
+            records (Sequence[tuple[Any, ...]]): The line, title, description
+              and is_done of each task.
+        """
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        # The asyncpg connection
+        driver_connection: Any = raw_connection.driver_connection
+        await driver_connection.copy_records_to_table(
+            import_table.name,
+            records=records,
+            columns=[import_column.name for import_column in import_table.columns],
+        )
+
+    async def merge_import_table(self, user_id: UUID) -> int:
+        """Create the user's tasks from the import table.
 
-        offset = (page - 1) * size
-        query = query.offset(offset).limit(size)
+        Args:
+            user_id (UUID): The owner of the tasks.
 
-        result = await self.session.execute(query)
-        tasks = result.scalars().all()
-        return tasks, total
+        Returns:
+            int: The number of created tasks.
+        """
+        staged = import_table.c
+        result = await self.session.execute(
+            insert(self.model).from_select(
+                ["title", "description", "is_done", "user_id"],
+                select(
+                    staged.title,
+                    staged.description,
+                    staged.is_done,
+                    literal(user_id, Uuid),
+                ).order_by(staged.line),
+            ),
+        )
+        return cast("CursorResult[Any]", result).rowcount
@@ -1,6 +1,7 @@
+import uuid
 from typing import Any
 
-from sqlalchemy.sql import select
+from sqlalchemy.sql import select, update
 
 from backend.db.models.users import User
 from backend.services.db.repository import BaseRepository
@@ -39,3 +40,36 @@ class UsersRepository(BaseRepository[User]):
         user = await self.add(**user_values)
         await self.session.flush()
         return user
+
+    async def get_tasks_version(self, user_id: uuid.UUID) -> int:
+        """
+        Get the version of the user's tasks.
+
+        Args:
+            user_id (uuid.UUID): The user's id.
+
+        Returns:
+            int: The version, 0 if the user was not found.
+        """
+        version = await self.session.scalar(
+            select(self.model.tasks_version).where(self.model.id == user_id),
+        )
+        return version or 0
+
+    async def increment_tasks_version(self, user_id: uuid.UUID) -> int:
+        """
+        Mark the user's tasks as changed.
+
+        Args:
+            user_id (uuid.UUID): The user's id.
+
+        Returns:
+            int: The new version, 0 if the user was not found.
+        """
+        version = await self.session.scalar(
+            update(self.model)
+            .where(self.model.id == user_id)
+            .values(tasks_version=self.model.tasks_version + 1)
+            .returning(self.model.tasks_version),
+        )
+        return version or 0
@@ -1,22 +1,83 @@
-from typing import Any, Dict, Optional, Sequence
+from datetime import date
+from typing import Any, AsyncGenerator, Dict, Optional, Sequence, cast
 from uuid import UUID
 
+from fastapi import Depends, HTTPException, status
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.db.dependencies import get_db_session
+from backend.db.models.task_stats import TaskDailyStats, UserTaskStats
 from backend.db.models.tasks import Task
-from backend.services.db.repository.tasks import TasksRepository
+from backend.services.cache.tasks import task_list_cache
+from backend.services.cache.writes import recent_writes
+from backend.services.db.pagination import decode_cursor, encode_cursor
+from backend.services.db.repository.task_stats import TaskDailyStatsRepository
+from backend.services.db.repository.tasks import RANK_SORT, TasksRepository
+from backend.services.db.repository.users import UsersRepository
 from backend.services.db.service import BaseService
-from backend.web.api.v1.tasks.schema import TaskCreate, TaskUpdate
+from backend.services.events import publish_task_events, task_change
+from backend.settings import settings
+from backend.web.api.v1.tasks.schema import TaskBatch, TaskCreate, TaskOut, TaskUpdate
+
+
+def _change(kind: str, task: Task) -> Dict[str, Any]:
+    """Describe a change of a task with its response fields."""
+    return task_change(kind, task.id, TaskOut.dump_attributes(task))
 
 
 class TasksService(BaseService[Task, TasksRepository]):
     """
     Tasks service.
 
+    Every change of the user's tasks increments the user's tasks version,
+    so unchanged task lists can be detected without querying them.
+
     Attributes:
         repository_class: The repository class for tasks.
+        users_repository (UsersRepository): The repository of the task owners.
+        daily_stats_repository (TaskDailyStatsRepository): The repository of
+          the daily task stats.
     """
 
     repository_class = TasksRepository
 
+    def __init__(self, session: AsyncSession = Depends(get_db_session)) -> None:
+        super().__init__(session)
+        self.users_repository = UsersRepository(session)
+        self.daily_stats_repository = TaskDailyStatsRepository(session)
+
+    async def _tasks_changed(
+        self,
+        user_id: UUID,
+        changes: Sequence[Dict[str, Any]],
+    ) -> None:
+        """
+        Increment the user's tasks version and publish the task events.
+
+        Both take effect when the transaction is committed. With a read
+        replica, the user reads from the primary for a while after it.
+
+        Args:
+            user_id (UUID): The user ID.
+            changes (Sequence[Dict[str, Any]]): The changes of the tasks.
+        """
+        version = await self.users_repository.increment_tasks_version(user_id)
+        await publish_task_events(self.repository.session, user_id, version, changes)
+        recent_writes.mark_after_commit(self.repository.session, user_id)
+
+    async def get_tasks_version(self, user_id: UUID) -> int:
+        """
+        Get the version of the user's tasks.
+
+        Args:
+            user_id (UUID): The user ID.
+
+        Returns:
+            int: The version, it changes whenever a task is changed.
+        """
+        return await self.users_repository.get_tasks_version(user_id)
+
     async def get_all_tasks(
         self,
         filters: Optional[Dict[str, Any]] = None,
@@ -24,21 +85,157 @@ class TasksService(BaseService[Task, TasksRepository]):
         sort_order: str = "asc",
         page: int = 1,
         size: int = 50,
-    ) -> tuple[Sequence[Task], int]:
+        cursor: Optional[str] = None,
+        total_limit: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None,
+        tasks_version: Optional[int] = None,
+    ) -> tuple[Sequence[Task | Row[Any]], int, Optional[str]]:
         """
         Get all tasks with filters, sorting and pagination.
 
+        Pages of a user's column projections are cached when the version of
+        the user's tasks is given, see ``TaskListCache``.
+
         Args:
             filters (Optional[Dict[str, Any]]): The filters to apply.
             sort_by (Optional[str]): The field to sort by.
             sort_order (str): The sort order.
-            page (int): The page number.
+            page (int): The page number, ignored when a cursor is given.
             size (int): The page size.
+            cursor (Optional[str]): The cursor returned with the previous page.
+            total_limit (Optional[int]): Stop counting tasks above this number.
+            fields (Optional[Sequence[str]]): Load only these columns as read
+              only rows instead of tasks.
+            tasks_version (Optional[int]): The version of the user's tasks,
+              read before the call.
 
         Returns:
-            tuple[Sequence[Task], int]: The tasks and the total count.
+            tuple[Sequence[Task | Row[Any]], int, Optional[str]]: The tasks,
+              the total count and the cursor of the next page if there may be
+              one. Pages ranked by full text search relevance have no cursor.
+
+        Raises:
+            HTTPException: If the cursor is invalid or given for a ranked page.
         """
-        return await self.repository.find_all(filters, sort_by, sort_order, page, size)
+        if fields is not None:
+            # The cursor is built from the last task's id and sort value
+            keys = ["id"]
+            if sort_by and hasattr(Task, sort_by):
+                keys.append(sort_by)
+            fields = [*fields, *(key for key in keys if key not in fields)]
+
+        user_id = (filters or {}).get("user_id")
+        if (
+            not settings.tasks_cache_enabled
+            or fields is None
+            or tasks_version is None
+            or user_id is None
+        ):
+            return await self._find_page(
+                filters,
+                sort_by,
+                sort_order,
+                page,
+                size,
+                cursor,
+                total_limit,
+                fields,
+            )
+
+        params = [
+            sorted((key, value) for key, value in filters.items() if key != "user_id")
+            if filters
+            else [],
+            sort_by,
+            sort_order,
+            page,
+            size,
+            cursor,
+            total_limit,
+            fields,
+        ]
+        cache_key = task_list_cache.key(user_id, tasks_version, params)
+        cached = await task_list_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        tasks, total, next_cursor = await self._find_page(
+            filters,
+            sort_by,
+            sort_order,
+            page,
+            size,
+            cursor,
+            total_limit,
+            fields,
+        )
+        # Projections are loaded as rows
+        rows = cast("Sequence[Row[Any]]", tasks)
+        await task_list_cache.set(cache_key, rows, total, next_cursor)
+        return tasks, total, next_cursor
+
+    async def _find_page(
+        self,
+        filters: Optional[Dict[str, Any]],
+        sort_by: Optional[str],
+        sort_order: str,
+        page: int,
+        size: int,
+        cursor: Optional[str],
+        total_limit: Optional[int],
+        fields: Optional[Sequence[str]],
+    ) -> tuple[Sequence[Task | Row[Any]], int, Optional[str]]:
+        """Query a page of tasks, see ``get_all_tasks``."""
+        ranked = sort_by == RANK_SORT and (filters or {}).get("search_vector")
+        if cursor and ranked:
+            # Ranked pages have no keyset to continue from
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Неверный курсор",
+            )
+        after = decode_cursor(cursor, sort_by, sort_order) if cursor else None
+        tasks, total = await self.repository.find_all(
+            filters,
+            sort_by,
+            sort_order,
+            page,
+            size,
+            after,
+            total_limit,
+            fields,
+        )
+
+        next_cursor = None
+        if tasks and len(tasks) == size and not ranked:
+            last_task = tasks[-1]
+            sort_value = None
+            if sort_by and hasattr(Task, sort_by):
+                sort_value = getattr(last_task, sort_by)
+            next_cursor = encode_cursor(sort_by, sort_order, sort_value, last_task.id)
+        return tasks, total, next_cursor
+
+    async def stream_tasks(
+        self,
+        filters: Optional[Dict[str, Any]],
+        fields: Sequence[str],
+    ) -> AsyncGenerator[Sequence[Row[Any]], None]:
+        """
+        Stream all tasks matching the filters in ID order.
+
+        The session keeps its connection until the stream ends.
+
+        Args:
+            filters (Optional[Dict[str, Any]]): The filters to apply.
+            fields (Sequence[str]): The columns to load.
+
+        Yields:
+            Sequence[Row[Any]]: The next batch of tasks.
+        """
+        async for tasks in self.repository.stream_all(
+            filters,
+            fields,
+            settings.tasks_export_batch_size,
+        ):
+            yield tasks
 
     async def create_task(self, task_data: TaskCreate, user_id: UUID) -> Task:
         """
@@ -52,46 +249,180 @@ class TasksService(BaseService[Task, TasksRepository]):
             Task: The created task.
         """
         task = await self.repository.add(**task_data.model_dump(), user_id=user_id)
-        await self.repository.session.commit()
+        await self.repository.session.flush()
+        await self._tasks_changed(user_id, [_change("created", task)])
         return task
 
-    async def get_task(self, task_id: int) -> Optional[Task]:
+    async def apply_batch(
+        self,
+        batch: TaskBatch,
+        user_id: UUID,
+    ) -> tuple[Sequence[Task], Dict[int, Task], set[int]]:
         """
-        Get a task by ID.
+        Create, update and delete the user's tasks in one transaction.
+
+        Each kind of operation runs as a single statement. Updates of the
+        same task are merged, later fields win. Tasks of other users are
+        neither updated nor deleted.
+
+        Args:
+            batch (TaskBatch): The operations.
+            user_id (UUID): The user ID.
+
+        Returns:
+            tuple[Sequence[Task], Dict[int, Task], set[int]]: The created tasks
+              in the requested order, the updated tasks by ID and the IDs of
+              the deleted tasks.
+        """
+        changes: Dict[int, Dict[str, Any]] = {}
+        for item in batch.update:
+            change = item.model_dump(exclude_unset=True, exclude={"id"})
+            changes.setdefault(item.id, {}).update(change)
+
+        created = await self.repository.add_many(
+            user_id,
+            [item.model_dump() for item in batch.create],
+        )
+        updated = await self.repository.update_many(user_id, changes)
+        deleted = await self.repository.delete_many(user_id, batch.delete)
+        if created or updated or deleted:
+            await self._tasks_changed(
+                user_id,
+                [
+                    *(_change("created", task) for task in created),
+                    *(_change("updated", task) for task in updated),
+                    *(task_change("deleted", task_id) for task_id in deleted),
+                ],
+            )
+        return created, {task.id: task for task in updated}, set(deleted)
+
+    async def start_import(self) -> None:
+        """Start an import, the tasks are staged until ``finish_import``."""
+        await self.repository.create_import_table()
+
+    async def stage_import(self, tasks: Sequence[tuple[int, TaskCreate]]) -> None:
+        """
+        Stage tasks of an import with ``COPY``.
+
+        Args:
+            tasks (Sequence[tuple[int, TaskCreate]]): The tasks and their lines
+              in the upload.
+        """
+        await self.repository.copy_to_import_table(
+            [
+                (line, task.title, task.description, task.is_done)
+                for line, task in tasks
+            ],
+        )
+
+    async def finish_import(self, user_id: UUID) -> int:
+        """
+        Create the staged tasks of an import.
+
+        The task streams of the user get a single ``imported`` change with
+        the number of tasks instead of a change per task.
+
+        Args:
+            user_id (UUID): The user ID.
+
+        Returns:
+            int: The number of created tasks.
+        """
+        imported = await self.repository.merge_import_table(user_id)
+        if imported:
+            change = {"type": "imported", "count": imported}
+            await self._tasks_changed(user_id, [change])
+        return imported
+
+    async def get_stats(
+        self,
+        user_id: UUID,
+        date_from: date,
+        date_to: date,
+    ) -> tuple[Optional[UserTaskStats], Sequence[TaskDailyStats]]:
+        """
+        Get the task counts and the daily stats of the user.
+
+        Args:
+            user_id (UUID): The user ID.
+            date_from (date): The first day.
+            date_to (date): The last day.
+
+        Returns:
+            tuple[Optional[UserTaskStats], Sequence[TaskDailyStats]]: The
+              counts, None if the user has no tasks, and the days with tasks.
+        """
+        totals = await self.daily_stats_repository.find_user_stats(user_id)
+        days = await self.daily_stats_repository.find_days(user_id, date_from, date_to)
+        return totals, days
+
+    async def get_task(self, task_id: int, user_id: UUID) -> Optional[Task]:
+        """
+        Get a task of the user by ID.
 
         Args:
             task_id (int): The task ID.
+            user_id (UUID): The user ID.
 
         Returns:
             Optional[Task]: The task if found, otherwise None.
         """
-        return await self.repository.find_one_or_none_by_id(task_id)
+        return await self.repository.find_one_or_none_for_user(task_id, user_id)
 
-    async def update_task(self, task_id: int, task_data: TaskUpdate) -> Optional[Task]:
+    async def update_task(
+        self,
+        task_id: int,
+        task_data: TaskUpdate,
+        user_id: UUID,
+        versions: Optional[Sequence[int]] = None,
+    ) -> Optional[Task]:
         """
-        Update a task.
+        Update a task of the user.
 
         Args:
             task_id (int): The task ID.
             task_data (TaskUpdate): The task data.
+            user_id (UUID): The user ID.
+            versions (Optional[Sequence[int]]): Update only if the task has one
+              of these versions.
 
         Returns:
             Optional[Task]: The updated task if found, otherwise None.
+
+        Raises:
+            HTTPException: If the task has another version.
         """
-        updated_task = await self.repository.update(
+        update_data = task_data.model_dump(exclude_unset=True)
+        updated_task = await self.repository.update_for_user(
             task_id,
-            **task_data.model_dump(exclude_unset=True),
+            user_id,
+            versions,
+            **update_data,
         )
-        if updated_task:
-            await self.repository.session.commit()
+        if updated_task is None:
+            if versions is not None and await self.get_task(task_id, user_id):
+                raise HTTPException(
+                    status_code=status.HTTP_412_PRECONDITION_FAILED,
+                    detail="Задача была изменена",
+                )
+            return None
+        # An empty update writes nothing, so there is no change to publish
+        if update_data:
+            await self._tasks_changed(user_id, [_change("updated", updated_task)])
         return updated_task
 
-    async def delete_task(self, task_id: int) -> None:
+    async def delete_task(self, task_id: int, user_id: UUID) -> bool:
         """
-        Delete a task.
+        Delete a task of the user.
 
         Args:
             task_id (int): The task ID.
+            user_id (UUID): The user ID.
+
+        Returns:
+            bool: True if the task was deleted, False if it was not found.
         """
-        await self.repository.delete(task_id)
-        await self.repository.session.commit()
+        deleted = await self.repository.delete_for_user(task_id, user_id)
+        if deleted:
+            await self._tasks_changed(user_id, [task_change("deleted", task_id)])
+        return deleted
@@ -4,13 +4,14 @@ from typing import TYPE_CHECKING, Any
 from fastapi import HTTPException, status
 
 from backend.db.models.users import User
+from backend.services.auth.cache import user_cache
 from backend.services.auth.password import PasswordHelper
+from backend.services.cache.writes import recent_writes
 from backend.services.db.repository.users import UsersRepository
 from backend.services.db.service import BaseService
-from backend.web.api.v1.auth.schema import UserLogin
 
 if TYPE_CHECKING:
-    from backend.web.api.v1.auth.schema import UserRegister
+    from backend.web.api.v1.auth.schema import UserLogin, UserRegister
 
 
 class UsersService(BaseService[User, UsersRepository]):
@@ -30,7 +31,7 @@ class UsersService(BaseService[User, UsersRepository]):
                 detail="Неверный UUID",
             ) from e
 
-    async def authenticate(self, credentials: UserLogin) -> User | None:
+    async def authenticate(self, credentials: "UserLogin") -> User | None:
         """
         Authenticate a user.
 
@@ -42,10 +43,11 @@ class UsersService(BaseService[User, UsersRepository]):
         """
         user = await self.get_by_email(credentials.email)
         if not user:
-            PasswordHelper.hash(credentials.password)
+            # Hash anyway, so unknown emails take as long as wrong passwords
+            await PasswordHelper.hash_async(credentials.password)
             return None
 
-        verified, updated_password_hash = PasswordHelper.verify_and_update(
+        verified, updated_password_hash = await PasswordHelper.verify_and_update_async(
             credentials.password,
             user.hashed_password,
         )
@@ -59,6 +61,8 @@ class UsersService(BaseService[User, UsersRepository]):
             )
             if not updated_user:
                 raise Exception("Failed to update password hash")
+            await user_cache.invalidate(user.id)
+            recent_writes.mark_after_commit(self.repository.session, user.id)
             user = updated_user
 
         return user
@@ -109,6 +113,8 @@ class UsersService(BaseService[User, UsersRepository]):
 
         user_dict = user_data.model_dump(include={"email", "password"})
         password = user_dict.pop("password")
-        user_dict["hashed_password"] = PasswordHelper.hash(password)
+        user_dict["hashed_password"] = await PasswordHelper.hash_async(password)
 
-        return await self.repository.create(**user_dict)
+        user = await self.repository.create(**user_dict)
+        recent_writes.mark_after_commit(self.repository.session, user.id)
+        return user
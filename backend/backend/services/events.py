@@ -0,0 +1,364 @@
+import asyncio
+import contextlib
+import logging
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, AsyncGenerator, Optional, Sequence
+
+from pydantic_core import from_json, to_json
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from backend.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Postgres channel of the task changes
+CHANNEL = "task_events"
+# Postgres rejects notification payloads of 8000 bytes and more
+PAYLOAD_LIMIT = 7500
+# Room for the user, version and part of a notification
+HEADER_SIZE = 200
+
+# (tasks version, part) of an event, the version is shared by a transaction
+EventKey = tuple[int, int]
+# Part of the keys covering every part of their version
+ALL_PARTS = 2**31
+
+
+def task_change(
+    kind: str,
+    task_id: int,
+    task: Optional[dict[str, Any]] = None,
+) -> dict[str, Any]:
+    """
+    Describe a change of a task.
+
+    Args:
+        kind (str): ``created``, ``updated`` or ``deleted``.
+        task_id (int): The task ID.
+        task (Optional[dict[str, Any]]): The task response fields.
+
+    Returns:
+        dict[str, Any]: The change.
+    """
+    change: dict[str, Any] = {"type": kind, "id": task_id}
+    if task is not None:
+        change["task"] = task
+    return change
+
+
+def _split_changes(changes: Sequence[dict[str, Any]]) -> list[list[dict[str, Any]]]:
+    """Split the changes into parts fitting a notification payload."""
+    parts: list[list[dict[str, Any]]] = []
+    part: list[dict[str, Any]] = []
+    size = HEADER_SIZE
+    for item in changes:
+        change = item
+        change_size = len(to_json(change)) + 1
+        if HEADER_SIZE + change_size > PAYLOAD_LIMIT:
+            # Too large to send, clients fetch the task by ID
+            change = {key: value for key, value in item.items() if key != "task"}
+            change_size = len(to_json(change)) + 1
+        if part and size + change_size > PAYLOAD_LIMIT:
+            parts.append(part)
+            part, size = [], HEADER_SIZE
+        part.append(change)
+        size += change_size
+    if part:
+        parts.append(part)
+    return parts
+
+
+async def publish_task_events(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    tasks_version: int,
+    changes: Sequence[dict[str, Any]],
+) -> None:
+    """
+    Notify the event streams of the user about the task changes.
+
+    The notifications are sent in the session transaction, so Postgres
+    delivers them to the listeners of all workers only after the commit
+    and drops them on rollback.
+
+    Args:
+        session (AsyncSession): The session making the changes.
+        user_id (uuid.UUID): The owner of the tasks.
+        tasks_version (int): The user's tasks version after the changes.
+        changes (Sequence[dict[str, Any]]): The changes, see ``task_change``.
+    """
+    for index, part in enumerate(_split_changes(changes)):
+        payload = to_json(
+            {
+                "user_id": str(user_id),
+                "version": tasks_version,
+                "part": index,
+                "changes": part,
+            },
+        )
+        await session.execute(select(func.pg_notify(CHANNEL, payload.decode())))
+
+
+def _format_event(key: EventKey, data: bytes, event: str = "tasks") -> bytes:
+    """Format a server-sent event, its id is ``<version>.<part>`` or ``<version>``.
+
+    A version without a part covers all the changes up to that version.
+    """
+    version, part = key
+    event_id = b"%d" % version if part == ALL_PARTS else b"%d.%d" % key
+    return b"id: %s\nevent: %s\ndata: %s\n\n" % (event_id, event.encode(), data)
+
+
+def _parse_event_id(event_id: Optional[str]) -> Optional[EventKey]:
+    """Parse the ``Last-Event-ID`` of a stream, None if invalid."""
+    if not event_id:
+        return None
+    version, separator, part = event_id.partition(".")
+    if not separator:
+        part = str(ALL_PARTS)
+    if not version.isdigit() or not part.isdigit():
+        return None
+    return int(version), int(part)
+
+
+class TaskEventSubscription:
+    """Events queued for a stream of a user.
+
+    Attributes:
+        user_id (uuid.UUID): The user's id.
+        queue (asyncio.Queue[Optional[tuple[EventKey, bytes]]]): The events,
+          None closes the stream.
+    """
+
+    def __init__(self, user_id: uuid.UUID, queue_size: int) -> None:
+        self.user_id = user_id
+        self.queue: asyncio.Queue[Optional[tuple[EventKey, bytes]]] = asyncio.Queue(
+            queue_size + 1,
+        )
+
+    def push(self, key: EventKey, event: bytes) -> None:
+        """Queue an event, closing the stream if the client is too slow."""
+        # One slot is left for closing
+        if self.queue.qsize() >= self.queue.maxsize - 1:
+            # Keep the memory bounded, the client resumes from its last event
+            self.close()
+        else:
+            self.queue.put_nowait((key, event))
+
+    def close(self) -> None:
+        """Drop the queued events and close the stream."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class TaskEventBroker:
+    """Fan-out of task changes to the event streams of this worker.
+
+    A dedicated connection of the engine listens to the Postgres channel
+    notified by ``publish_task_events``, so every worker receives the changes
+    made by any of them. The last events of each user are kept to resume
+    streams from ``Last-Event-ID``. Listening needs a session mode
+    connection, it doesn't work through PgBouncer in transaction mode.
+
+    Attributes:
+        history (int): The number of events kept per user.
+        max_users (int): The number of users whose events are kept.
+        queue_size (int): The number of events queued per stream.
+        heartbeat (float): Seconds between comments sent to idle streams.
+    """
+
+    def __init__(
+        self,
+        history: int,
+        max_users: int,
+        queue_size: int,
+        heartbeat: float,
+    ) -> None:
+        self.history = history
+        self.max_users = max_users
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self._connection: Optional[AsyncConnection] = None
+        self._lost: Optional[AsyncConnection] = None
+        self._lock = asyncio.Lock()
+        self._events: OrderedDict[uuid.UUID, deque[tuple[EventKey, bytes]]] = (
+            OrderedDict()
+        )
+        self._subscriptions: dict[uuid.UUID, set[TaskEventSubscription]] = {}
+
+    async def start(self, engine: AsyncEngine) -> None:
+        """
+        Start listening unless already listening.
+
+        Args:
+            engine (AsyncEngine): The engine to take the connection from.
+        """
+        async with self._lock:
+            if self._connection is not None:
+                return
+            await self._release_lost()
+            connection = await engine.connect()
+            raw_connection = await connection.get_raw_connection()
+            # The asyncpg connection
+            driver_connection: Any = raw_connection.driver_connection
+            driver_connection.add_termination_listener(self._on_terminate)
+            await driver_connection.add_listener(CHANNEL, self._on_notify)
+            self._connection = connection
+
+    async def close(self) -> None:
+        """Stop listening and close all streams."""
+        self._close_subscriptions()
+        async with self._lock:
+            self._lost, self._connection = self._connection, None
+            await self._release_lost()
+
+    async def _release_lost(self) -> None:
+        """Close the listening connection instead of returning it to the pool."""
+        if self._lost is not None:
+            connection, self._lost = self._lost, None
+            with contextlib.suppress(Exception):
+                await connection.invalidate()
+                await connection.close()
+
+    def _close_subscriptions(self) -> None:
+        for subscriptions in self._subscriptions.values():
+            for subscription in subscriptions:
+                subscription.close()
+
+    def _on_terminate(self, _connection: Any) -> None:
+        """Close the streams, so clients reconnect and listening restarts."""
+        logger.warning("Task events connection lost")
+        self._lost, self._connection = self._connection, None
+        self._close_subscriptions()
+
+    def _on_notify(
+        self,
+        _connection: Any,
+        _pid: int,
+        _channel: str,
+        payload: str,
+    ) -> None:
+        notification = from_json(payload)
+        user_id = uuid.UUID(notification["user_id"])
+        key = (notification["version"], notification["part"])
+        data = to_json(
+            {"version": notification["version"], "changes": notification["changes"]},
+        )
+        event = _format_event(key, data)
+
+        events = self._events.get(user_id)
+        if events is None:
+            events = self._events[user_id] = deque(maxlen=self.history)
+            if len(self._events) > self.max_users:
+                self._events.popitem(last=False)
+        else:
+            self._events.move_to_end(user_id)
+        events.append((key, event))
+
+        for subscription in self._subscriptions.get(user_id, ()):
+            subscription.push(key, event)
+
+    def subscribe(self, user_id: uuid.UUID) -> TaskEventSubscription:
+        """
+        Start queueing the task changes of the user.
+
+        Subscribe before reading the tasks version, so no change after
+        that version is missed.
+
+        Args:
+            user_id (uuid.UUID): The user's id.
+
+        Returns:
+            TaskEventSubscription: The subscription, pass it to ``stream``.
+        """
+        subscription = TaskEventSubscription(user_id, self.queue_size)
+        self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: TaskEventSubscription) -> None:
+        """Stop queueing the changes of a subscription, once is enough."""
+        subscriptions = self._subscriptions.get(subscription.user_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.user_id]
+
+    def _replay(
+        self,
+        user_id: uuid.UUID,
+        last_key: EventKey,
+        tasks_version: int,
+    ) -> Optional[list[tuple[EventKey, bytes]]]:
+        """Get the kept events after the last one, None if some were lost."""
+        events = self._events.get(user_id, deque())
+        if tasks_version <= last_key[0] or (events and events[0][0] <= last_key):
+            return [(key, event) for key, event in events if key > last_key]
+        return None
+
+    async def stream(
+        self,
+        subscription: TaskEventSubscription,
+        last_event_id: Optional[str],
+        tasks_version: int,
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        Stream the task changes of the user as server-sent events.
+
+        The subscription is closed once the stream ends.
+
+        Args:
+            subscription (TaskEventSubscription): The subscription of the
+              user, made before reading the tasks version.
+            last_event_id (Optional[str]): The last event the client received.
+            tasks_version (int): The user's tasks version.
+
+        Yields:
+            bytes: The events, heartbeat comments and ``reset`` events telling
+              the client to reload the tasks, as changes since its last event
+              were not kept.
+        """
+        user_id = subscription.user_id
+        try:
+            yield b"retry: 3000\n\n"
+            last_key = _parse_event_id(last_event_id)
+            if last_key is None:
+                # The client loaded the tasks of the version with all its parts
+                last_key = (tasks_version, ALL_PARTS)
+            else:
+                replay = self._replay(user_id, last_key, tasks_version)
+                if replay is None:
+                    last_key = (tasks_version, ALL_PARTS)
+                    yield _format_event(last_key, b"{}", "reset")
+                else:
+                    for key, event in replay:
+                        last_key = key
+                        yield event
+            while True:
+                try:
+                    item = await asyncio.wait_for(
+                        subscription.queue.get(),
+                        self.heartbeat,
+                    )
+                except TimeoutError:
+                    yield b": heartbeat\n\n"
+                    continue
+                if item is None:
+                    return
+                key, event = item
+                # Skip the events already replayed
+                if key > last_key:
+                    last_key = key
+                    yield event
+        finally:
+            self.unsubscribe(subscription)
+
+
+task_event_broker = TaskEventBroker(
+    history=settings.task_events_history,
+    max_users=settings.task_events_max_users,
+    queue_size=settings.task_events_queue_size,
+    heartbeat=settings.task_events_heartbeat,
+)
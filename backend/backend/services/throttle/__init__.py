@@ -0,0 +1,83 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from backend.settings import settings
+
+
+class ThrottleBackend(ABC):
+    """Token buckets, one per key, refilled at a steady rate."""
+
+    @abstractmethod
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        """Take a token from the bucket of the key.
+
+        Args:
+            key (str): The bucket key.
+            rate (float): Tokens added per second.
+            burst (int): The bucket capacity, a new bucket is full.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the seconds until
+              the next token.
+        """
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Release the backend resources."""
+
+
+class MemoryThrottleBackend(ThrottleBackend):
+    """In-process token buckets.
+
+    Only the ``max_keys`` most recently used buckets are kept, an evicted
+    bucket is full again.
+
+    Attributes:
+        max_keys (int): The maximum number of buckets.
+    """
+
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        """Take a token from the bucket of the key, see ``ThrottleBackend``."""
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated_at) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+    async def close(self) -> None:
+        """Drop all buckets."""
+        self._buckets.clear()
+
+
+def create_throttle_backend(namespace: str, max_keys: int) -> ThrottleBackend:
+    """Create a throttle backend for the given namespace.
+
+    The buckets are shared by all workers if ``cache_url`` is set,
+    otherwise they are kept in-process.
+
+    Args:
+        namespace (str): The prefix of the keys in a shared backend.
+        max_keys (int): The buckets limit of an in-process backend.
+
+    Returns:
+        ThrottleBackend: The throttle backend.
+    """
+    if settings.cache_url:
+        from backend.services.throttle.redis import (  # noqa: PLC0415
+            RedisThrottleBackend,
+        )
+
+        return RedisThrottleBackend(settings.cache_url, prefix=f"{namespace}:")
+    return MemoryThrottleBackend(max_keys)
@@ -0,0 +1,49 @@
+from redis.asyncio import Redis
+
+from backend.services.throttle import ThrottleBackend
+
+# Refills and takes a token atomically, with the clock of the redis server
+TAKE_SCRIPT = """
+local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or burst
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+return tostring(wait)
+"""
+
+
+class RedisThrottleBackend(ThrottleBackend):
+    """Redis token buckets shared by all workers.
+
+    Requires the ``redis`` extra. A bucket expires once it would be full
+    again.
+
+    Attributes:
+        client (Redis): The redis client.
+        prefix (str): The prefix of all keys.
+    """
+
+    def __init__(self, url: str, prefix: str = "") -> None:
+        self.client = Redis.from_url(url)
+        self.prefix = prefix
+        self._take = self.client.register_script(TAKE_SCRIPT)
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        """Take a token from the bucket of the key, see ``ThrottleBackend``."""
+        wait = await self._take(keys=[self.prefix + key], args=[rate, burst])
+        return float(wait)
+
+    async def close(self) -> None:
+        """Close the redis connections."""
+        await self.client.aclose()
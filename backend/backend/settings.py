@@ -1,6 +1,7 @@
 from enum import StrEnum
 from pathlib import Path
 from tempfile import gettempdir
+from typing import Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -20,6 +21,20 @@ class LogLevel(StrEnum):
     FATAL = "FATAL"
 
 
+class SearchMode(StrEnum):
+    """Possible substring search modes for task filters."""
+
+    LIKE = "LIKE"
+    ILIKE = "ILIKE"
+
+
+class ExecutorKind(StrEnum):
+    """Possible worker pools for CPU bound work."""
+
+    THREAD = "THREAD"
+    PROCESS = "PROCESS"
+
+
 class Settings(BaseSettings):
     """Application settings."""
 
@@ -31,9 +46,74 @@ class Settings(BaseSettings):
     # Enable uvicorn reloading
     reload: bool = False
 
+    # Pay the one-time costs of the first requests before a worker serves,
+    # it is ready once done, or serves cold after the timeout until done
+    warmup_enabled: bool = True
+    warmup_timeout: float = 30
+
     log_level: LogLevel = LogLevel.INFO
+    # Metrics of all uvicorn workers are aggregated through this directory
+    prometheus_dir: Path = TEMP_DIR / "prom"
     users_secret: str = Field(default=...)
 
+    # Worker pool for password hashing, so it doesn't block the event loop
+    password_hasher_executor: ExecutorKind = ExecutorKind.THREAD
+    password_hasher_workers: int = 2
+    # Hashing calls allowed to wait for a worker before answering with 503
+    password_hasher_queue_size: int = 32
+
+    # Token buckets of login and registration attempts per client IP and
+    # per email, shared by all workers with the shared cache
+    auth_throttle_enabled: bool = True
+    auth_throttle_ip_per_minute: float = 30
+    auth_throttle_ip_burst: int = 20
+    auth_throttle_email_per_minute: float = 5
+    auth_throttle_email_burst: int = 10
+    auth_throttle_max_keys: int = 100_000
+
+    # Cache of authenticated users, skips the users lookup on every request
+    user_cache_ttl: int = 60
+    user_cache_max_entries: int = 10_000
+    # Trust the user claims of access tokens without any lookup
+    auth_stateless: bool = False
+
+    # Cache of task list pages, invalidated by any change of the user's tasks
+    tasks_cache_enabled: bool = True
+    tasks_cache_ttl: int = 300
+    tasks_cache_max_entries: int = 10_000
+    # Total size of the cached pages in an in-process cache
+    tasks_cache_max_bytes: int = 64 * 1024 * 1024
+
+    # Tasks fetched at once by exports
+    tasks_export_batch_size: int = 1000
+
+    # Largest accepted task import, uploads are spooled to disk
+    tasks_import_max_bytes: int = 100 * 1024 * 1024
+    # Tasks loaded at once by imports
+    tasks_import_batch_size: int = 1000
+
+    # Live task events, the last events of each user are kept to resume streams
+    task_events_history: int = 100
+    task_events_max_users: int = 10_000
+    # Events queued per stream, slower clients are disconnected and resume
+    task_events_queue_size: int = 100
+    # Seconds between heartbeats of idle streams
+    task_events_heartbeat: int = 15
+
+    # Responses compressed with the encoding negotiated from Accept-Encoding,
+    # br requires the brotli extra and zstd the zstd extra
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_level: int = 4
+    compression_zstd_level: int = 3
+    # Bodies compressed in a worker thread, so they don't block the event loop
+    compression_thread_size: int = 64 * 1024
+
+    # Cache shared by all workers, e.g. redis://localhost:6379/0,
+    # in-process caches are used if unset (requires the redis extra)
+    cache_url: Optional[str] = None
+
     # Variables for the database
     db_host: str = "localhost"
     db_port: int = 5432
@@ -41,6 +121,29 @@ class Settings(BaseSettings):
     db_pass: str = Field(default=...)
     db_base: str = "admin"
     db_echo: bool = False
+    # Connection pool of every uvicorn worker
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = -1
+    db_pool_pre_ping: bool = False
+    # Prepared statements cached per connection
+    db_statement_cache_size: int = 100
+    # Run behind PgBouncer in transaction mode, disables prepared statements cache
+    db_pgbouncer: bool = False
+    # Read replica, the read only requests are served by it if the host is set
+    db_replica_host: Optional[str] = None
+    db_replica_port: int = 5432
+    # Seconds users read from the primary after changing their tasks,
+    # must exceed the replication lag
+    db_replica_read_your_writes: float = 5
+    db_replica_max_writers: int = 10_000
+
+    # Case sensitivity of title and description filters,
+    # both are served by the pg_trgm indexes
+    tasks_search_mode: SearchMode = SearchMode.LIKE
+    # Tasks list totals stop counting here when the exact total is not requested
+    tasks_total_limit: int = 1000
 
     @property
     def db_url(self) -> URL:
@@ -54,6 +157,15 @@ class Settings(BaseSettings):
             path=f"/{self.db_base}",
         )
 
+    @property
+    def db_replica_url(self) -> Optional[URL]:
+        """Assemble read replica URL from settings, None if there is none."""
+        if self.db_replica_host is None:
+            return None
+        return self.db_url.with_host(self.db_replica_host).with_port(
+            self.db_replica_port,
+        )
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -0,0 +1,3 @@
+from backend.web.api.monitoring.views import router
+
+__all__ = ["router"]
@@ -0,0 +1,45 @@
+import os
+
+from fastapi import APIRouter, Request, Response, status
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    generate_latest,
+    multiprocess,
+)
+
+router = APIRouter()
+
+
+@router.get(
+    "/metrics",
+    summary="Get metrics",
+    operation_id="read_metrics",
+    description="Expose application metrics in the Prometheus text format.",
+    include_in_schema=False,
+)
+async def metrics() -> Response:
+    """Отдать метрики в формате Prometheus."""
+    registry = REGISTRY
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        # Aggregate the metrics written by all uvicorn workers
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+@router.get(
+    "/ready",
+    summary="Check readiness",
+    operation_id="read_readiness",
+    description="204 once the worker is warmed up and serving, 503 before "
+    "and while it shuts down.",
+    status_code=status.HTTP_204_NO_CONTENT,
+    include_in_schema=False,
+)
+async def ready(request: Request) -> Response:
+    """Проверить готовность воркера."""
+    if not request.app.state.ready:
+        return Response(status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
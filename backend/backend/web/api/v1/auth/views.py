@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 
 from backend.db.models.users import User
 from backend.services.auth import auth_service
 from backend.services.auth.depends import get_current_user
+from backend.services.auth.throttle import auth_throttle
 from backend.services.db.service.users import UsersService
 from backend.web.api.v1.auth.schema import (
     InvalidCredentialsResponse,
@@ -13,6 +16,18 @@ from backend.web.api.v1.auth.schema import (
 
 router = APIRouter()
 
+THROTTLED_RESPONSES: dict[int | str, dict[str, Any]] = {
+    status.HTTP_429_TOO_MANY_REQUESTS: {
+        "description": "Слишком много попыток, см. Retry-After",
+        "model": InvalidCredentialsResponse,
+    },
+}
+
+
+def client_ip(request: Request) -> Optional[str]:
+    """IP of the client, as seen through the trusted proxies."""
+    return request.client.host if request.client else None
+
 
 @router.post(
     "/login",
@@ -25,9 +40,11 @@ router = APIRouter()
             "description": "Неверный логин или пароль",
             "model": InvalidCredentialsResponse,
         },
+        **THROTTLED_RESPONSES,
     },
 )
 async def login(
+    request: Request,
     credentials: UserLogin,
     users_service: UsersService = Depends(),
 ) -> Response:
@@ -35,12 +52,14 @@ async def login(
     Log in a user.
 
     Args:
+        request (Request): The request.
         credentials (UserLogin): The user login credentials.
         users_service (UsersService): The users service.
 
     Returns:
         Response: The response with the token in a cookie.
     """
+    await auth_throttle.check(client_ip(request), credentials.email)
     user = await users_service.authenticate(credentials)
 
     if user is None:
@@ -72,8 +91,10 @@ async def refresh_token(
     summary="Register a new user",
     description="Create a new user account with the provided registration data.",
     operation_id="register_user",
+    responses=THROTTLED_RESPONSES,
 )
 async def register(
+    request: Request,
     form_data: UserRegister,
     service: UsersService = Depends(),
 ) -> User:
@@ -81,12 +102,14 @@ async def register(
     Register a new user.
 
     Args:
+        request (Request): The request.
         form_data (UserRegister): The form data with email, password, etc.
         service (UsersService): The users service.
 
     Returns:
         UserRead: The newly created user.
     """
+    await auth_throttle.check(client_ip(request), form_data.email)
     return await service.create(form_data)
 
 
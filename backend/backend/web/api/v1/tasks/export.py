@@ -0,0 +1,74 @@
+import csv
+import io
+from typing import Any, AsyncGenerator, Dict, Optional, Sequence
+
+from pydantic_core import to_json, to_jsonable_python
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.services.db.service.tasks import TasksService
+from backend.web.api.v1.tasks.schema import TaskFileFormat, TaskOut
+
+MEDIA_TYPES = {
+    TaskFileFormat.NDJSON: "application/x-ndjson",
+    TaskFileFormat.CSV: "text/csv",
+}
+
+
+def _csv_value(value: Any) -> Any:
+    """Write booleans as in JSON."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+def encode_ndjson(tasks: Sequence[Row[Any]]) -> bytes:
+    """Encode tasks as JSON lines."""
+    return b"".join(to_json(TaskOut.dump_attributes(task)) + b"\n" for task in tasks)
+
+
+def encode_csv(tasks: Sequence[Row[Any]], header: bool = False) -> bytes:
+    """Encode tasks as CSV rows, columns are named as the JSON fields."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(
+            field.alias or name for name, field in TaskOut.model_fields.items()
+        )
+    for task in tasks:
+        values = to_jsonable_python(TaskOut.dump_attributes(task)).values()
+        writer.writerow(_csv_value(value) for value in values)
+    return buffer.getvalue().encode()
+
+
+async def export_tasks(
+    session_factory: async_sessionmaker[AsyncSession],
+    filters: Optional[Dict[str, Any]],
+    export_format: TaskFileFormat,
+) -> AsyncGenerator[bytes, None]:
+    """
+    Stream the tasks matching the filters in the export format.
+
+    The export uses its own session, as the request session is closed
+    before the response is streamed.
+
+    Args:
+        session_factory (async_sessionmaker[AsyncSession]): The session factory.
+        filters (Optional[Dict[str, Any]]): The filters to apply.
+        export_format (TaskFileFormat): The format.
+
+    Yields:
+        bytes: The encoded batches of tasks.
+    """
+    if export_format == TaskFileFormat.CSV:
+        yield encode_csv([], header=True)
+    async with session_factory() as session:
+        tasks_service = TasksService(session)
+        async for tasks in tasks_service.stream_tasks(
+            filters,
+            list(TaskOut.model_fields),
+        ):
+            if export_format == TaskFileFormat.CSV:
+                yield encode_csv(tasks)
+            else:
+                yield encode_ndjson(tasks)
@@ -0,0 +1,211 @@
+import csv
+import logging
+import tempfile
+import uuid
+from typing import Any, AsyncGenerator, AsyncIterable, Optional, Sequence
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from pydantic_core import to_json
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from backend.db.unit_of_work import commit
+from backend.services.db.service.tasks import TasksService
+from backend.web.api.v1.tasks.schema import TaskCreate, TaskFileFormat
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+# Uploads larger than this are spooled to disk
+SPOOL_SIZE = 1024 * 1024
+# Longest accepted line or CSV record of an upload
+MAX_RECORD_SIZE = 64 * 1024
+
+Upload = tempfile.SpooledTemporaryFile[bytes]
+
+
+class InvalidUploadError(ValueError):
+    """The upload can't be read any further."""
+
+
+async def spool_upload(chunks: AsyncIterable[bytes], max_size: int) -> Upload:
+    """
+    Receive an upload into a temporary file.
+
+    Args:
+        chunks (AsyncIterable[bytes]): The request body.
+        max_size (int): The largest accepted upload.
+
+    Returns:
+        Upload: The file, rewound.
+
+    Raises:
+        HTTPException: If the upload is too large.
+    """
+    # Closed by the caller
+    upload: Upload = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)  # noqa: SIM115
+    try:
+        size = 0
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_size:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail="Файл слишком большой",
+                )
+            await run_in_threadpool(upload.write, chunk)
+        await run_in_threadpool(upload.seek, 0)
+    except BaseException:
+        upload.close()
+        raise
+    return upload
+
+
+async def _read_lines(upload: Upload) -> AsyncGenerator[tuple[int, bytes], None]:
+    """Read the upload lines with their numbers."""
+    buffer = b""
+    number = 0
+    while chunk := await run_in_threadpool(upload.read, CHUNK_SIZE):
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        for line in lines:
+            number += 1
+            yield number, line
+        if len(buffer) > MAX_RECORD_SIZE:
+            raise InvalidUploadError(f"Строка {number + 1} слишком длинная")
+    if buffer:
+        yield number + 1, buffer
+
+
+async def _read_records(
+    upload: Upload,
+    import_format: TaskFileFormat,
+) -> AsyncGenerator[tuple[int, bytes], None]:
+    """Read the non-empty records of the upload with their first line numbers.
+
+    A CSV record spans several lines if a quoted value has line breaks.
+    """
+    record: list[bytes] = []
+    quotes = 0
+    start = 0
+    async for number, line in _read_lines(upload):
+        if import_format == TaskFileFormat.NDJSON:
+            if line.strip():
+                yield number, line
+            continue
+        if not record:
+            start = number
+        record.append(line)
+        quotes += line.count(b'"')
+        if quotes % 2:
+            if sum(map(len, record)) > MAX_RECORD_SIZE:
+                raise InvalidUploadError(f"Запись со строки {start} слишком длинная")
+            continue
+        data = b"\n".join(record)
+        record, quotes = [], 0
+        if data.strip():
+            yield start, data
+    if record:
+        raise InvalidUploadError(f"Запись со строки {start} не закончена")
+
+
+def _parse_csv(data: bytes) -> list[str]:
+    """Parse a CSV record."""
+    return next(csv.reader([data.decode("utf-8-sig")]))
+
+
+def _parse_task(
+    data: bytes,
+    import_format: TaskFileFormat,
+    header: Optional[Sequence[str]],
+) -> TaskCreate:
+    """Validate a record of the upload."""
+    if import_format == TaskFileFormat.NDJSON:
+        return TaskCreate.model_validate_json(data)
+    values = _parse_csv(data)
+    return TaskCreate.model_validate(dict(zip(header or (), values, strict=False)))
+
+
+def _errors(error: ValueError) -> list[dict[str, Any]]:
+    """Describe why a record is invalid."""
+    if isinstance(error, ValidationError):
+        return [
+            {"loc": list(details["loc"]), "msg": details["msg"]}
+            for details in error.errors(include_url=False)
+        ]
+    return [{"loc": [], "msg": str(error)}]
+
+
+def _message(**fields: Any) -> bytes:
+    return to_json(fields) + b"\n"
+
+
+async def import_tasks(
+    session_factory: async_sessionmaker[AsyncSession],
+    user_id: uuid.UUID,
+    upload: Upload,
+    import_format: TaskFileFormat,
+    batch_size: int,
+) -> AsyncGenerator[bytes, None]:
+    """
+    Import the tasks of an upload and report the progress as JSON lines.
+
+    Valid tasks are staged in batches with ``COPY`` and created in one
+    transaction at the end, so either all of them are created or none.
+    The messages have a ``type``:
+
+    - ``error``: the record starting at ``line`` is skipped, see ``errors``.
+    - ``progress``: ``rows`` records were read, ``staged`` of them are valid.
+    - ``done``: ``imported`` tasks were created.
+    - ``aborted``: nothing was created, see ``detail``.
+
+    Args:
+        session_factory (async_sessionmaker[AsyncSession]): The session factory.
+        user_id (uuid.UUID): The owner of the tasks.
+        upload (Upload): The upload, closed when the import ends.
+        import_format (TaskFileFormat): The upload format, CSV uploads start
+          with a header of the field names.
+        batch_size (int): The number of tasks staged at once.
+
+    Yields:
+        bytes: The messages.
+    """
+    rows = staged = 0
+    try:
+        async with session_factory() as session:
+            tasks_service = TasksService(session)
+            await tasks_service.start_import()
+            header = None
+            batch: list[tuple[int, TaskCreate]] = []
+            async for line, data in _read_records(upload, import_format):
+                if import_format == TaskFileFormat.CSV and header is None:
+                    try:
+                        header = _parse_csv(data)
+                    except ValueError as error:
+                        raise InvalidUploadError("Неверный заголовок CSV") from error
+                    continue
+                rows += 1
+                try:
+                    batch.append((line, _parse_task(data, import_format, header)))
+                except ValueError as error:
+                    yield _message(type="error", line=line, errors=_errors(error))
+                if len(batch) >= batch_size:
+                    await tasks_service.stage_import(batch)
+                    staged += len(batch)
+                    batch = []
+                    yield _message(type="progress", rows=rows, staged=staged)
+            if batch:
+                await tasks_service.stage_import(batch)
+                staged += len(batch)
+                yield _message(type="progress", rows=rows, staged=staged)
+            imported = await tasks_service.finish_import(user_id)
+            await commit(session)
+    except InvalidUploadError as error:
+        yield _message(type="aborted", detail=str(error))
+    except Exception:
+        logger.exception("Task import failed")
+        yield _message(type="aborted", detail="Импорт не выполнен")
+    else:
+        yield _message(type="done", imported=imported)
+    finally:
+        upload.close()
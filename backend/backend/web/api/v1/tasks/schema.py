@@ -1,13 +1,27 @@
-from datetime import datetime
-from typing import TYPE_CHECKING, Optional, Self, Sequence
+from datetime import date, datetime, timedelta
+from enum import StrEnum
+from typing import TYPE_CHECKING, Any, Dict, Optional, Self, Sequence
 
 from pydantic import Field
 
-from backend.web.schemas import BaseModel, Paginated
+from backend.web.schemas import BaseModel
 
 if TYPE_CHECKING:
+    from sqlalchemy.engine import Row
+
+    from backend.db.models.task_stats import TaskDailyStats, UserTaskStats
     from backend.db.models.tasks import Task
 
+# Maximum number of operations of each kind in a batch
+BATCH_MAX_SIZE = 1000
+# Days of the task stats by default and at most
+STATS_DEFAULT_DAYS = 30
+STATS_MAX_DAYS = 366
+# Defaults of the task list query, the warm-up prepares their statement
+LIST_DEFAULT_SORT_BY = "created_at"
+LIST_DEFAULT_SORT_ORDER = "asc"
+LIST_DEFAULT_INCLUDE_TOTAL = True
+
 
 class TaskCreate(BaseModel):
     """Task creation request payload."""
@@ -33,19 +47,155 @@ class TaskOut(BaseModel):
     description: str
     is_done: bool
     created_at: datetime
+    completed_at: Optional[datetime] = None
 
     @classmethod
-    def to_paginated(
+    def dump_paginated(
         cls,
-        items: list["Task"] | Sequence["Task"],
+        items: Sequence["Task | Row[Any]"],
         total: int,
         page: int,
         size: int,
-    ) -> Paginated[Self]:
-        """Create a Paginated from a list and total."""
-        return Paginated(
-            items=[cls.model_validate(item) for item in items],
+        next_cursor: Optional[str] = None,
+        total_limit: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Dump the paginated JSON fields without validating the items.
+
+        Same as dumping a ``Paginated`` of the validated items by alias,
+        but a lot faster for large pages.
+        """
+        return {
+            "items": [cls.dump_attributes(item) for item in items],
+            "total": total if total_limit is None else min(total, total_limit),
+            "totalExact": total_limit is None or total <= total_limit,
+            "page": page,
+            "size": size,
+            "nextCursor": next_cursor,
+        }
+
+
+class TaskDayStats(BaseModel):
+    """Tasks created and completed on a day."""
+
+    day: date
+    created: int
+    completed: int
+    avg_completion_seconds: Optional[float] = None
+
+
+class TaskStats(BaseModel):
+    """Task statistics payload.
+
+    ``total``, ``done`` and ``open`` count all the tasks, the other fields
+    cover the requested days. Completion time is from creation to
+    completion of the tasks completed on those days.
+    """
+
+    total: int
+    done: int
+    open: int
+    created: int
+    completed: int
+    avg_completion_seconds: Optional[float] = None
+    days: list[TaskDayStats]
+
+    @classmethod
+    def from_rollup(
+        cls,
+        totals: Optional["UserTaskStats"],
+        rollup: Sequence["TaskDailyStats"],
+        date_from: date,
+        date_to: date,
+    ) -> Self:
+        """Create the stats of a period, days without tasks are zero."""
+        by_day = {row.day: row for row in rollup}
+        days = []
+        for offset in range((date_to - date_from).days + 1):
+            day = date_from + timedelta(days=offset)
+            row = by_day.get(day)
+            if row is None:
+                days.append(TaskDayStats(day=day, created=0, completed=0))
+                continue
+            days.append(
+                TaskDayStats(
+                    day=day,
+                    created=row.created,
+                    completed=row.completed,
+                    avg_completion_seconds=_average(
+                        row.completion_seconds,
+                        row.completed,
+                    ),
+                ),
+            )
+        total = totals.total if totals else 0
+        done = totals.done if totals else 0
+        completed = sum(row.completed for row in rollup)
+        return cls(
             total=total,
-            page=page,
-            size=size,
+            done=done,
+            open=total - done,
+            created=sum(row.created for row in rollup),
+            completed=completed,
+            avg_completion_seconds=_average(
+                sum(row.completion_seconds for row in rollup),
+                completed,
+            ),
+            days=days,
         )
+
+
+def _average(seconds: int, count: int) -> Optional[float]:
+    return seconds / count if count else None
+
+
+class TaskFileFormat(StrEnum):
+    """Format of task exports and imports."""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class TaskBatchUpdate(TaskUpdate):
+    """Partial update of a task in a batch."""
+
+    id: int
+
+
+class TaskBatch(BaseModel):
+    """Batch of task operations applied in one transaction.
+
+    Creates run first, then updates, then deletes.
+    """
+
+    create: list[TaskCreate] = Field(default_factory=list, max_length=BATCH_MAX_SIZE)
+    update: list[TaskBatchUpdate] = Field(
+        default_factory=list,
+        max_length=BATCH_MAX_SIZE,
+    )
+    delete: list[int] = Field(default_factory=list, max_length=BATCH_MAX_SIZE)
+
+
+class TaskBatchStatus(StrEnum):
+    """Outcome of a batch operation."""
+
+    OK = "ok"
+    NOT_FOUND = "not_found"
+
+
+class TaskBatchItem(BaseModel):
+    """Result of a batch operation.
+
+    ``task`` is set for successful creates and updates.
+    """
+
+    id: int
+    status: TaskBatchStatus
+    task: Optional[TaskOut] = None
+
+
+class TaskBatchResult(BaseModel):
+    """Batch response payload, one item per requested operation."""
+
+    created: list[TaskBatchItem]
+    updated: list[TaskBatchItem]
+    deleted: list[TaskBatchItem]
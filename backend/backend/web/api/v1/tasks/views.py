@@ -1,17 +1,79 @@
-from typing import Any
+from datetime import UTC, date, datetime, timedelta
+from typing import Any, Optional
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 
 from backend.db.models.tasks import Task
 from backend.db.models.users import User
 from backend.services.auth.depends import get_current_user
 from backend.services.db.service.tasks import TasksService
-from backend.web.api.v1.tasks.schema import TaskCreate, TaskOut, TaskUpdate
-from backend.web.schemas import Paginated
+from backend.services.events import task_event_broker
+from backend.settings import settings
+from backend.web.api.v1.tasks.export import MEDIA_TYPES, export_tasks
+from backend.web.api.v1.tasks.imports import import_tasks, spool_upload
+from backend.web.api.v1.tasks.schema import (
+    LIST_DEFAULT_INCLUDE_TOTAL,
+    LIST_DEFAULT_SORT_BY,
+    LIST_DEFAULT_SORT_ORDER,
+    STATS_DEFAULT_DAYS,
+    STATS_MAX_DAYS,
+    TaskBatch,
+    TaskBatchItem,
+    TaskBatchResult,
+    TaskBatchStatus,
+    TaskCreate,
+    TaskFileFormat,
+    TaskOut,
+    TaskStats,
+    TaskUpdate,
+)
+from backend.web.conditional import (
+    CACHE_CONTROL,
+    etag_matches,
+    make_etag,
+    not_modified,
+    strong_etag_values,
+)
+from backend.web.schemas import Paginated, json_response
 
 router = APIRouter(dependencies=[Depends(get_current_user)])
 
 
+def list_etag(user_id: UUID, tasks_version: int) -> str:
+    """ETag of the user's task lists, it changes with any of the tasks."""
+    return make_etag(user_id, tasks_version, weak=True)
+
+
+def list_total_limit(include_total: bool) -> Optional[int]:
+    """Limit of the list count, None to count all matching tasks."""
+    return None if include_total else settings.tasks_total_limit
+
+
+def task_etag(task: Task) -> str:
+    """ETag of a task, its quoted version."""
+    return f'"{task.version}"'
+
+
+def task_response(task: Task) -> Response:
+    """Task response with its ETag."""
+    return json_response(
+        TaskOut.dump_attributes(task),
+        headers={"ETag": task_etag(task), "Cache-Control": CACHE_CONTROL},
+    )
+
+
 @router.get(
     "/",
     response_model=Paginated[TaskOut],
@@ -22,26 +84,62 @@ router = APIRouter(dependencies=[Depends(get_current_user)])
 async def get_tasks(
     title: str | None = Query(None, max_length=255),
     is_done: bool | None = Query(None),
+    q: str | None = Query(
+        None,
+        max_length=255,
+        description="Full text search over title and description.",
+    ),
     sort_by: str | None = Query(
-        "created_at",
-        enum=["title", "description", "is_done", "created_at"],
+        LIST_DEFAULT_SORT_BY,
+        enum=["title", "description", "is_done", "created_at", "rank"],
+        description="`rank` orders by relevance to `q`, most relevant first.",
     ),
-    sort_order: str = Query("asc", enum=["asc", "desc"]),
-    page: int = Query(..., ge=1),
+    sort_order: str = Query(LIST_DEFAULT_SORT_ORDER, enum=["asc", "desc"]),
+    page: int = Query(1, ge=1),
     size: int = Query(..., ge=1),
+    cursor: str | None = Query(
+        None,
+        description="Cursor from `nextCursor` of the previous page, "
+        "overrides `page`.",
+    ),
+    include_total: bool = Query(
+        LIST_DEFAULT_INCLUDE_TOTAL,
+        description="Count all matching tasks, otherwise the count stops "
+        "at a limit and `totalExact` is false above it.",
+    ),
+    if_none_match: str | None = Header(None),
     user: User = Depends(get_current_user),
     tasks_service: TasksService = Depends(),
-) -> Paginated[TaskOut]:
+) -> Response:
     """Получить список задач с фильтрацией, сортировкой и пагинацией."""
-    filters: dict[str, Any] = {"title": title, "is_done": is_done, "user_id": user.id}
-    tasks, total = await tasks_service.get_all_tasks(
+    # The version is read before the page, so the ETag is never newer
+    tasks_version = await tasks_service.get_tasks_version(user.id)
+    etag = list_etag(user.id, tasks_version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    filters: dict[str, Any] = {
+        "title": title,
+        "is_done": is_done,
+        "search_vector": q,
+        "user_id": user.id,
+    }
+    total_limit = list_total_limit(include_total)
+    tasks, total, next_cursor = await tasks_service.get_all_tasks(
         filters,
         sort_by,
         sort_order,
         page,
         size,
+        cursor,
+        total_limit,
+        fields=list(TaskOut.model_fields),
+        tasks_version=tasks_version,
+    )
+    return json_response(
+        TaskOut.dump_paginated(tasks, total, page, size, next_cursor, total_limit),
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
     )
-    return TaskOut.to_paginated(tasks, total, page, size)
 
 
 @router.post(
@@ -55,9 +153,199 @@ async def create_task(
     task_data: TaskCreate,
     user: User = Depends(get_current_user),
     tasks_service: TasksService = Depends(),
-) -> Task:
+) -> Response:
     """Создать новую задачу."""
-    return await tasks_service.create_task(task_data, user.id)
+    task = await tasks_service.create_task(task_data, user.id)
+    return task_response(task)
+
+
+@router.post(
+    "/batch",
+    response_model=TaskBatchResult,
+    summary="Apply a batch of task operations",
+    operation_id="batch_tasks",
+    description="Create, update and delete tasks of the current user "
+    "in one transaction. Results are reported per operation, tasks that "
+    "don't exist or belong to another user are `not_found`.",
+)
+async def batch_tasks(
+    batch: TaskBatch,
+    user: User = Depends(get_current_user),
+    tasks_service: TasksService = Depends(),
+) -> TaskBatchResult:
+    """Выполнить пакет операций над задачами."""
+    created, updated, deleted = await tasks_service.apply_batch(batch, user.id)
+    return TaskBatchResult(
+        created=[
+            TaskBatchItem(
+                id=task.id,
+                status=TaskBatchStatus.OK,
+                task=TaskOut.model_validate(task),
+            )
+            for task in created
+        ],
+        updated=[
+            TaskBatchItem(
+                id=item.id,
+                status=TaskBatchStatus.OK,
+                task=TaskOut.model_validate(updated[item.id]),
+            )
+            if item.id in updated
+            else TaskBatchItem(id=item.id, status=TaskBatchStatus.NOT_FOUND)
+            for item in batch.update
+        ],
+        deleted=[
+            TaskBatchItem(
+                id=task_id,
+                status=TaskBatchStatus.OK
+                if task_id in deleted
+                else TaskBatchStatus.NOT_FOUND,
+            )
+            for task_id in batch.delete
+        ],
+    )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary="Export tasks",
+    operation_id="export_tasks",
+    description="Stream all tasks of the current user as NDJSON or CSV.",
+)
+async def export_user_tasks(
+    request: Request,
+    export_format: TaskFileFormat = Query(TaskFileFormat.NDJSON, alias="format"),
+    title: str | None = Query(None, max_length=255),
+    is_done: bool | None = Query(None),
+    user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Выгрузить все задачи."""
+    filters: dict[str, Any] = {
+        "title": title,
+        "is_done": is_done,
+        "user_id": user.id,
+    }
+    return StreamingResponse(
+        export_tasks(request.app.state.db_session_factory, filters, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="tasks.{export_format}"',
+        },
+    )
+
+
+@router.post(
+    "/import",
+    response_class=StreamingResponse,
+    summary="Import tasks",
+    operation_id="import_tasks",
+    description="Create tasks of the current user from an NDJSON or CSV "
+    "upload, CSV uploads start with a header of the field names. The "
+    "response reports the progress and invalid rows as JSON lines, the "
+    "valid tasks are created together at the end.",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                media_type: {"schema": {"type": "string", "format": "binary"}}
+                for media_type in MEDIA_TYPES.values()
+            },
+        },
+    },
+)
+async def import_user_tasks(
+    request: Request,
+    import_format: TaskFileFormat = Query(TaskFileFormat.NDJSON, alias="format"),
+    user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Загрузить задачи из файла."""
+    # The upload is received before responding, the progress is streamed after
+    upload = await spool_upload(request.stream(), settings.tasks_import_max_bytes)
+    return StreamingResponse(
+        import_tasks(
+            request.app.state.db_session_factory,
+            user.id,
+            upload,
+            import_format,
+            settings.tasks_import_batch_size,
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get(
+    "/events",
+    response_class=StreamingResponse,
+    summary="Stream task changes",
+    operation_id="stream_task_events",
+    description="Server-sent events with the created, updated and deleted "
+    "tasks of the current user. Reconnecting with `Last-Event-ID` resumes "
+    "the stream, a `reset` event or an `imported` change asks to reload "
+    "the tasks instead.",
+)
+async def stream_task_events(
+    request: Request,
+    last_event_id: str | None = Header(None),
+    user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Получить поток изменений задач."""
+    await task_event_broker.start(request.app.state.db_engine)
+    subscription = task_event_broker.subscribe(user.id)
+    try:
+        # The version is read from the primary, a lagging replica could
+        # miss changes published before the subscription
+        async with request.app.state.db_read_session_factory() as session:
+            tasks_version = await TasksService(session).get_tasks_version(user.id)
+    except BaseException:
+        task_event_broker.unsubscribe(subscription)
+        raise
+    return StreamingResponse(
+        task_event_broker.stream(subscription, last_event_id, tasks_version),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # The stream may be cancelled before it starts
+        background=BackgroundTask(task_event_broker.unsubscribe, subscription),
+    )
+
+
+@router.get(
+    "/stats",
+    response_model=TaskStats,
+    summary="Get task statistics",
+    operation_id="read_task_stats",
+    description="Task counts of the current user and the tasks created and "
+    "completed on each day of a period, by default the last "
+    f"{STATS_DEFAULT_DAYS} days, at most {STATS_MAX_DAYS} days. Days are in "
+    "UTC.",
+)
+async def get_task_stats(
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    if_none_match: str | None = Header(None),
+    user: User = Depends(get_current_user),
+    tasks_service: TasksService = Depends(),
+) -> Response:
+    """Получить статистику задач по дням."""
+    if date_to is None:
+        date_to = datetime.now(UTC).date()
+    if date_from is None:
+        date_from = date_to - timedelta(days=STATS_DEFAULT_DAYS - 1)
+    if not 0 <= (date_to - date_from).days < STATS_MAX_DAYS:
+        raise HTTPException(status_code=400, detail="Неверный период")
+
+    tasks_version = await tasks_service.get_tasks_version(user.id)
+    etag = make_etag(user.id, tasks_version, date_from, date_to, weak=True)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    totals, days = await tasks_service.get_stats(user.id, date_from, date_to)
+    return json_response(
+        TaskStats.from_rollup(totals, days, date_from, date_to).model_dump(
+            mode="json",
+            by_alias=True,
+        ),
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
 
 
 @router.get(
@@ -69,14 +357,17 @@ async def create_task(
 )
 async def get_task(
     task_id: int,
+    if_none_match: str | None = Header(None),
     user: User = Depends(get_current_user),
     tasks_service: TasksService = Depends(),
-) -> Task:
+) -> Response:
     """Получить задачу по ID."""
-    task = await tasks_service.get_task(task_id)
-    if task is None or task.user_id != user.id:
+    task = await tasks_service.get_task(task_id, user.id)
+    if task is None:
         raise HTTPException(status_code=404, detail="Задача не найдена")
-    return task
+    if etag_matches(if_none_match, task_etag(task)):
+        return not_modified(task_etag(task))
+    return task_response(task)
 
 
 @router.put(
@@ -84,19 +375,25 @@ async def get_task(
     response_model=TaskOut,
     summary="Update a task",
     operation_id="update_task",
-    description="Update a task for the current user.",
+    description="Update a task for the current user. With `If-Match` the "
+    "task is updated only if its ETag matches, otherwise 412 is returned.",
 )
 async def update_task(
     task_id: int,
     task_data: TaskUpdate,
+    if_match: str | None = Header(None),
     user: User = Depends(get_current_user),
     tasks_service: TasksService = Depends(),
-) -> Task:
+) -> Response:
     """Обновить задачу."""
-    task = await tasks_service.update_task(task_id, task_data)
-    if task is None or task.user_id != user.id:
+    versions = None
+    etags = strong_etag_values(if_match)
+    if etags is not None:
+        versions = [int(etag) for etag in etags if etag.isdigit()]
+    task = await tasks_service.update_task(task_id, task_data, user.id, versions)
+    if task is None:
         raise HTTPException(status_code=404, detail="Задача не найдена")
-    return task
+    return task_response(task)
 
 
 @router.delete(
@@ -108,7 +405,9 @@ async def update_task(
 )
 async def delete_task(
     task_id: int,
+    user: User = Depends(get_current_user),
     tasks_service: TasksService = Depends(),
 ) -> None:
     """Удалить задачу."""
-    await tasks_service.delete_task(task_id)
+    if not await tasks_service.delete_task(task_id, user.id):
+        raise HTTPException(status_code=404, detail="Задача не найдена")
@@ -5,8 +5,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import UJSONResponse
 
 from backend.log import configure_logging
+from backend.settings import settings
+from backend.web.api import monitoring
 from backend.web.api.v1.router import v1_router
 from backend.web.lifespan import lifespan_setup
+from backend.web.middleware.compression import CompressionMiddleware, load_compressors
+from backend.web.middleware.metrics import MetricsMiddleware
 
 APP_ROOT = Path(__file__).parent.parent
 
@@ -26,7 +30,19 @@ def get_app() -> FastAPI:
     )
 
     app.include_router(router=v1_router, prefix="/v1")
-
+    app.include_router(router=monitoring.router, tags=["Monitoring"])
+
+    if settings.compression_enabled:
+        app.add_middleware(
+            CompressionMiddleware,
+            compressors=load_compressors(
+                settings.compression_gzip_level,
+                settings.compression_brotli_level,
+                settings.compression_zstd_level,
+            ),
+            minimum_size=settings.compression_minimum_size,
+            thread_size=settings.compression_thread_size,
+        )
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["http://localhost:3000", "http://localhost:3030"],
@@ -34,5 +50,6 @@ def get_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    app.add_middleware(MetricsMiddleware)
 
     return app
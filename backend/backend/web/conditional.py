@@ -0,0 +1,68 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Response, status
+
+# Clients must revalidate the cached responses of the current user
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: object, weak: bool = False) -> str:
+    """Make an opaque ETag from the given parts.
+
+    Args:
+        *parts: Values identifying the representation.
+        weak (bool): Whether the ETag is weak.
+
+    Returns:
+        str: The quoted ETag.
+    """
+    digest = hashlib.sha256(":".join(map(str, parts)).encode()).hexdigest()[:16]
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def _split_etags(header: str) -> list[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Check an ``If-None-Match`` header with the weak comparison.
+
+    Args:
+        header (Optional[str]): The header value.
+        etag (str): The current ETag.
+
+    Returns:
+        bool: True if the header matches the ETag.
+    """
+    if header is None:
+        return False
+    tags = _split_etags(header)
+    if "*" in tags:
+        return True
+    return etag.removeprefix("W/") in {tag.removeprefix("W/") for tag in tags}
+
+
+def strong_etag_values(header: Optional[str]) -> Optional[list[str]]:
+    """Get the unquoted strong ETags of an ``If-Match`` header.
+
+    Args:
+        header (Optional[str]): The header value.
+
+    Returns:
+        Optional[list[str]]: The ETag values, None if any ETag matches.
+    """
+    if header is None:
+        return None
+    tags = _split_etags(header)
+    if "*" in tags:
+        return None
+    return [tag.strip('"') for tag in tags if not tag.startswith("W/")]
+
+
+def not_modified(etag: str) -> Response:
+    """Make a ``304 Not Modified`` response for the ETag."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
@@ -1,30 +1,137 @@
-from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+import asyncio
+import os
+from contextlib import asynccontextmanager, suppress
+from typing import Any, AsyncGenerator
+from uuid import uuid4
 
 from fastapi import FastAPI
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from prometheus_client import multiprocess
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
+from backend.db.events import setup_statement_timing
+from backend.db.pool import InstrumentedQueuePool
+from backend.services.auth.cache import user_cache
+from backend.services.auth.password import password_pool
+from backend.services.auth.throttle import auth_throttle
+from backend.services.cache.tasks import task_list_cache
+from backend.services.cache.writes import recent_writes
+from backend.services.events import task_event_broker
 from backend.settings import settings
+from backend.web.warmup import warm_up_until_ready
+
+
+def _connect_args() -> dict[str, Any]:
+    """Arguments of new asyncpg connections.
+
+    The sessions run in UTC, so the naive task timestamps set by ``now()``
+    and the days of the task stats are in UTC.
+    """
+    server_settings = {"timezone": "UTC"}
+    if settings.db_pgbouncer:
+        # PgBouncer may run each statement on another server connection,
+        # so prepared statements can't be reused and need unique names.
+        return {
+            "server_settings": server_settings,
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return {
+        "server_settings": server_settings,
+        "statement_cache_size": settings.db_statement_cache_size,
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+    }
+
+
+def _create_engine(url: str, pool_name: str) -> AsyncEngine:
+    """Create a db engine with the pool settings, its metrics by pool name."""
+    engine = create_async_engine(
+        url,
+        echo=settings.db_echo,
+        poolclass=InstrumentedQueuePool,
+        pool_name=pool_name,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=_connect_args(),
+    )
+    setup_statement_timing(engine)
+    return engine
+
+
+def _read_only_session_factory(
+    engine: AsyncEngine,
+) -> async_sessionmaker[AsyncSession]:
+    """Session factory in autocommit mode, reads need no transaction."""
+    return async_sessionmaker(
+        engine.execution_options(isolation_level="AUTOCOMMIT"),
+        expire_on_commit=False,
+    )
 
 
 def _setup_db(app: FastAPI) -> None:
-    """Create db engine and session factory."""
-    engine = create_async_engine(str(settings.db_url), echo=settings.db_echo)
+    """Create db engines and session factories.
+
+    The read only session factories run in autocommit mode. Without a read
+    replica the replica session factory reads from the primary.
+    """
+    engine = _create_engine(str(settings.db_url), "primary")
     session_factory = async_sessionmaker(
         engine,
         expire_on_commit=False,
     )
     app.state.db_engine = engine
     app.state.db_session_factory = session_factory
+    app.state.db_read_session_factory = _read_only_session_factory(engine)
+
+    app.state.db_replica_engine = None
+    app.state.db_replica_session_factory = app.state.db_read_session_factory
+    if settings.db_replica_url is not None:
+        replica_engine = _create_engine(str(settings.db_replica_url), "replica")
+        app.state.db_replica_engine = replica_engine
+        app.state.db_replica_session_factory = _read_only_session_factory(
+            replica_engine,
+        )
 
 
 @asynccontextmanager
 async def lifespan_setup(
     app: FastAPI,
 ) -> AsyncGenerator[None, None]:
-    """Actions to run on application startup."""
+    """Actions to run on application startup.
+
+    The worker starts serving once warmed up or after the warm-up timeout,
+    the readiness endpoint reports when the warm-up is done.
+    """
     _setup_db(app)
+    app.state.ready = not settings.warmup_enabled
+    warmup = None
+    if settings.warmup_enabled:
+        warmup = asyncio.create_task(warm_up_until_ready(app))
+        await asyncio.wait([warmup], timeout=settings.warmup_timeout)
 
     yield
 
+    app.state.ready = False
+    if warmup is not None:
+        warmup.cancel()
+        with suppress(asyncio.CancelledError):
+            await warmup
+    await task_event_broker.close()
     await app.state.db_engine.dispose()
+    if app.state.db_replica_engine is not None:
+        await app.state.db_replica_engine.dispose()
+    password_pool.shutdown()
+    await user_cache.backend.close()
+    await task_list_cache.backend.close()
+    await recent_writes.backend.close()
+    await auth_throttle.backend.close()
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(os.getpid())  # type: ignore[no-untyped-call]
@@ -0,0 +1,174 @@
+import functools
+import gzip
+import logging
+from typing import Callable, Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+Compressor = Callable[[bytes], bytes]
+
+# Encodings in order of preference when the client accepts several equally
+ENCODINGS = ("zstd", "br", "gzip")
+
+
+def load_compressors(
+    gzip_level: int,
+    brotli_level: int,
+    zstd_level: int,
+) -> Dict[str, Compressor]:
+    """Get the compressors of the available encodings.
+
+    gzip is always available, br requires the ``brotli`` extra and zstd
+    the ``zstd`` extra before Python 3.14.
+
+    Args:
+        gzip_level (int): The gzip level, 1 to 9.
+        brotli_level (int): The brotli quality, 0 to 11.
+        zstd_level (int): The zstd level, 1 to 22.
+
+    Returns:
+        Dict[str, Compressor]: The compressors by encoding.
+    """
+    compressors: Dict[str, Compressor] = {
+        "gzip": functools.partial(gzip.compress, compresslevel=gzip_level, mtime=0),
+    }
+    try:
+        import brotli  # noqa: PLC0415
+
+        compressors["br"] = functools.partial(brotli.compress, quality=brotli_level)
+    except ImportError:
+        logger.debug("brotli is not installed, br responses are disabled")
+    try:
+        try:
+            from compression import zstd  # noqa: PLC0415
+        except ImportError:
+            from backports import zstd  # noqa: PLC0415
+
+        compressors["zstd"] = functools.partial(zstd.compress, level=zstd_level)
+    except ImportError:
+        logger.debug("zstd is not installed, zstd responses are disabled")
+    return compressors
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Get the quality of each encoding in an ``Accept-Encoding`` header.
+
+    Encodings with a malformed quality are not accepted.
+    """
+    qualities: Dict[str, float] = {}
+    for item in header.split(","):
+        name, *params = (part.strip() for part in item.split(";"))
+        if not name:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.lower()] = quality
+    return qualities
+
+
+def negotiate_encoding(header: str, available: Dict[str, Compressor]) -> Optional[str]:
+    """Pick the available encoding the client prefers, None if there is none.
+
+    Args:
+        header (str): The ``Accept-Encoding`` header.
+        available (Dict[str, Compressor]): The compressors by encoding.
+
+    Returns:
+        Optional[str]: The encoding.
+    """
+    qualities = parse_accept_encoding(header)
+    default = qualities.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = qualities.get(encoding, default)
+        if encoding in available and quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """Compress response bodies with the encoding negotiated per request.
+
+    Only bodies sent at once are compressed, streamed bodies like event
+    streams and exports are sent as is. Bodies below ``minimum_size`` gain
+    nothing and bodies from ``thread_size`` on are compressed in a worker
+    thread, so they don't block the event loop. ETags are kept as they
+    are, ``If-Match`` compares them with the task versions.
+
+    Attributes:
+        app (ASGIApp): The wrapped application.
+        compressors (Dict[str, Compressor]): The compressors by encoding.
+        minimum_size (int): The smallest body compressed, in bytes.
+        thread_size (int): The smallest body compressed in a thread, in bytes.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        compressors: Dict[str, Compressor],
+        minimum_size: int = 1024,
+        thread_size: int = 64 * 1024,
+    ) -> None:
+        self.app = app
+        self.compressors = compressors
+        self.minimum_size = minimum_size
+        self.thread_size = thread_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle the request and compress its response."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding", ""),
+            self.compressors,
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        compress = self.compressors[encoding]
+        start: Optional[Message] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if start is None:
+                await send(message)
+                return
+            response_start, start = start, None
+            body: bytes = message.get("body", b"")
+            headers = MutableHeaders(scope=response_start)
+            if (
+                message["type"] != "http.response.body"
+                or message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+            ):
+                await send(response_start)
+                await send(message)
+                return
+
+            if len(body) >= self.thread_size:
+                body = await run_in_threadpool(compress, body)
+            else:
+                body = compress(body)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(response_start)
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,8 +1,10 @@
-from typing import Generic, List, Sequence, TypeVar
+from typing import Any, Dict, Generic, List, Mapping, Optional, Sequence, TypeVar
 
+from fastapi import Response, status
 from pydantic import BaseModel as PydanticBaseModel
 from pydantic import ConfigDict
 from pydantic.alias_generators import to_camel
+from pydantic_core import to_json
 
 
 class BaseModel(PydanticBaseModel):
@@ -15,14 +17,49 @@ class BaseModel(PydanticBaseModel):
         arbitrary_types_allowed=True,
     )
 
+    @classmethod
+    def dump_attributes(cls, obj: Any) -> Dict[str, Any]:
+        """Dump the object attributes by alias without validating them.
+
+        Only for flat models and objects whose attributes already have the
+        field types, e.g. the ORM rows the model would be validated from.
+        """
+        return {
+            field.alias or name: getattr(obj, name)
+            for name, field in cls.model_fields.items()
+        }
+
 
 T = TypeVar("T", bound=BaseModel)
 
 
 class Paginated(BaseModel, Generic[T]):
-    """Base Pydantic model for paginated response."""
+    """Base Pydantic model for paginated response.
+
+    If ``total_exact`` is false there are more than ``total`` items.
+    """
 
     items: Sequence[T] | List[T]
     total: int
+    total_exact: bool = True
     page: int
     size: int
+    next_cursor: Optional[str] = None
+
+
+def json_response(
+    content: Any,
+    status_code: int = status.HTTP_200_OK,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """Encode already valid content to JSON once.
+
+    Returning the response from a view skips its ``response_model``
+    validation and serialization.
+    """
+    return Response(
+        to_json(content),
+        status_code,
+        headers=headers,
+        media_type="application/json",
+    )
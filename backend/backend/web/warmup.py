@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import secrets
+import time
+import uuid
+from datetime import UTC, datetime
+
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.db.models.tasks import Task
+from backend.services.auth.password import PasswordHelper, password_pool
+from backend.services.db.service.tasks import TasksService
+from backend.services.db.service.users import UsersService
+from backend.settings import settings
+from backend.web.api.v1.tasks.schema import (
+    LIST_DEFAULT_INCLUDE_TOTAL,
+    LIST_DEFAULT_SORT_BY,
+    LIST_DEFAULT_SORT_ORDER,
+    TaskCreate,
+    TaskOut,
+)
+from backend.web.api.v1.tasks.views import list_total_limit
+from backend.web.schemas import json_response
+
+logger = logging.getLogger(__name__)
+
+# Seconds between the attempts of a failed warm-up
+RETRY_SECONDS = 5
+# Page size of the warmed up task list statement, the default of the clients
+PAGE_SIZE = 50
+
+
+async def _run_hot_statements(
+    session_factory: async_sessionmaker[AsyncSession],
+    user_id: uuid.UUID,
+) -> None:
+    """Run the statements of the most frequent requests in a new session.
+
+    The user doesn't exist, so the statements are compiled, prepared on
+    the connection and answered from the indexes without returning rows.
+    The task list is queried with the defaults of the list view.
+    """
+    async with session_factory() as session:
+        users_service = UsersService(session)
+        await users_service.get_by_id(user_id)
+        await users_service.get_by_email(f"{user_id}@warmup.invalid")
+        tasks_service = TasksService(session)
+        await tasks_service.get_tasks_version(user_id)
+        await tasks_service.get_all_tasks(
+            {"user_id": user_id},
+            LIST_DEFAULT_SORT_BY,
+            LIST_DEFAULT_SORT_ORDER,
+            size=PAGE_SIZE,
+            total_limit=list_total_limit(LIST_DEFAULT_INCLUDE_TOTAL),
+            fields=list(TaskOut.model_fields),
+        )
+        await tasks_service.get_task(0, user_id)
+
+
+async def _warm_up_database(session_factory: async_sessionmaker[AsyncSession]) -> None:
+    """Open the pool connections and prepare the hot statements on each.
+
+    The sessions run at the same time, so each one checks out its own
+    connection, and asyncpg introspects the types on all of them.
+    """
+    user_id = uuid.uuid4()
+    await asyncio.gather(
+        *(
+            _run_hot_statements(session_factory, user_id)
+            for _ in range(settings.db_pool_size)
+        ),
+    )
+
+
+async def _warm_up_password_pool() -> None:
+    """Start every hashing worker and run the first hash on each."""
+    password = secrets.token_urlsafe()
+    await asyncio.gather(
+        *(PasswordHelper.hash_async(password) for _ in range(password_pool.workers)),
+    )
+
+
+def _warm_up_serialization(app: FastAPI) -> None:
+    """Build the OpenAPI schema and serialize a task like the views."""
+    app.openapi()
+    task = Task(
+        id=0,
+        title="warm-up",
+        description="warm-up",
+        is_done=False,
+        created_at=datetime.now(UTC),
+        completed_at=None,
+    )
+    TaskCreate.model_validate(
+        {"title": task.title, "description": task.description, "isDone": False},
+    )
+    TaskOut.model_validate(task).model_dump(by_alias=True)
+    json_response(TaskOut.dump_paginated([task], 1, 1, PAGE_SIZE))
+
+
+async def warm_up(app: FastAPI) -> None:
+    """
+    Pay the one-time costs of the first requests before serving them.
+
+    Opens the database connections of the primary and the replica pools,
+    prepares the hot statements on them, starts the password hashing
+    workers and builds the OpenAPI schema.
+
+    Args:
+        app (FastAPI): The application, with the session factories set up.
+    """
+    start = time.perf_counter()
+    await _warm_up_database(app.state.db_read_session_factory)
+    if app.state.db_replica_engine is not None:
+        await _warm_up_database(app.state.db_replica_session_factory)
+    await _warm_up_password_pool()
+    _warm_up_serialization(app)
+    logger.info("Warmed up in %.3f s", time.perf_counter() - start)
+
+
+async def warm_up_until_ready(app: FastAPI) -> None:
+    """
+    Warm up, retrying on failures, then mark the application ready.
+
+    Args:
+        app (FastAPI): The application.
+    """
+    while True:
+        try:
+            await warm_up(app)
+        except Exception:
+            logger.exception("Warm-up failed, retrying in %d s", RETRY_SECONDS)
+            await asyncio.sleep(RETRY_SECONDS)
+        else:
+            app.state.ready = True
+            return
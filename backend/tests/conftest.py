@@ -0,0 +1,9 @@
+import os
+
+# Required settings without defaults, the tests don't connect anywhere
+os.environ.setdefault("USERS_SECRET", "test-secret")
+os.environ.setdefault("DB_PASS", "test-password")
+
+from backend.db.models import load_all_models  # noqa: E402
+
+load_all_models()
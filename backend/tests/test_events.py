@@ -0,0 +1,23 @@
+import asyncio
+import uuid
+
+from backend.services.events import TaskEventBroker
+
+VERSION = 5
+
+
+async def _fresh_stream_events() -> list[bytes]:
+    broker = TaskEventBroker(history=10, max_users=10, queue_size=10, heartbeat=60)
+    subscription = broker.subscribe(uuid.uuid4())
+    stream = broker.stream(subscription, None, VERSION)
+    retry = await anext(stream)
+    # Notified after subscribing, but part of the version the client read
+    subscription.push((VERSION, 0), b"late")
+    subscription.push((VERSION + 1, 0), b"next")
+    # Ends the stream after the queued events
+    subscription.queue.put_nowait(None)
+    return [retry, *[event async for event in stream]]
+
+
+def test_fresh_stream_skips_late_events_of_its_version() -> None:
+    assert asyncio.run(_fresh_stream_events()) == [b"retry: 3000\n\n", b"next"]
@@ -0,0 +1,41 @@
+import asyncio
+from unittest.mock import MagicMock
+
+from prometheus_client import REGISTRY
+from sqlalchemy.util import greenlet_spawn
+
+from backend.db.pool import InstrumentedQueuePool
+
+PRIMARY_SIZE = 3
+REPLICA_SIZE = 2
+
+
+def _pool_sample(name: str, pool: InstrumentedQueuePool) -> float | None:
+    return REGISTRY.get_sample_value(name, {"pool": pool.pool_name})
+
+
+def test_pools_report_usage_by_name() -> None:
+    primary = InstrumentedQueuePool(MagicMock, pool_size=PRIMARY_SIZE)
+    replica = InstrumentedQueuePool(
+        MagicMock,
+        pool_name="replica",
+        pool_size=REPLICA_SIZE,
+    )
+
+    def check_out() -> None:
+        connections = [primary.connect(), replica.connect()]
+        assert _pool_sample("db_pool_size", primary) == PRIMARY_SIZE
+        assert _pool_sample("db_pool_size", replica) == REPLICA_SIZE
+        assert _pool_sample("db_pool_checked_out", primary) == 1
+        assert _pool_sample("db_pool_checked_out", replica) == 1
+        for connection in connections:
+            connection.close()
+        assert _pool_sample("db_pool_checked_out", primary) == 0
+        assert _pool_sample("db_pool_checked_out", replica) == 0
+
+    asyncio.run(greenlet_spawn(check_out))
+
+
+def test_recreated_pool_keeps_name() -> None:
+    pool = InstrumentedQueuePool(MagicMock, pool_name="replica")
+    assert pool.recreate().pool_name == "replica"
@@ -0,0 +1,19 @@
+import uuid
+
+from sqlalchemy.dialects.postgresql.asyncpg import PGDialect_asyncpg
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.services.db.repository.tasks import TasksRepository
+
+
+def test_update_many_query_types_missing_fields() -> None:
+    repository = TasksRepository(AsyncSession())
+    query = repository.build_update_many_query(
+        uuid.uuid4(),
+        {1: {"title": "first"}, 2: {"description": "second"}},
+    )
+    asyncpg = PGDialect_asyncpg()  # type: ignore[no-untyped-call]
+    sql = str(query.compile(dialect=asyncpg))
+    assert "coalesce(CAST(changes.is_done AS BOOLEAN), tasks.is_done)" in sql
+    assert "coalesce(CAST(changes.title AS VARCHAR), tasks.title)" in sql
+    assert "coalesce(CAST(changes.description AS VARCHAR), tasks.description)" in sql